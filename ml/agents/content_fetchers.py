@@ -4,6 +4,8 @@ Phase 1: YouTube API + Transcript fetching
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from youtube_transcript_api import YouTubeTranscriptApi
 from googleapiclient.discovery import build
@@ -11,6 +13,19 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# googleapiclient's httplib2 transport is not thread-safe, so keep one built
+# client per thread: threadpool workers reuse their discovery doc and
+# keep-alive connection instead of rebuilding on every fetch.
+_local = threading.local()
+
+
+def _youtube_client(api_key: str):
+    cached = getattr(_local, "youtube", None)
+    if cached is None or cached[0] != api_key:
+        cached = (api_key, build('youtube', 'v3', developerKey=api_key))
+        _local.youtube = cached
+    return cached[1]
+
 
 class YouTubeFetcher:
     """Fetch YouTube video content including transcripts."""
@@ -19,7 +34,7 @@ class YouTubeFetcher:
         api_key = os.getenv("YOUTUBE_API_KEY")
         if not api_key:
             raise ValueError("YOUTUBE_API_KEY not found in environment variables")
-        self.youtube = build('youtube', 'v3', developerKey=api_key)
+        self.youtube = _youtube_client(api_key)
     
     def fetch_creator_content(
         self,
@@ -48,9 +63,13 @@ class YouTubeFetcher:
         # Get recent videos
         videos = self._get_recent_videos(channel_id, max_videos)
         
+        # Transcripts are independent requests; fetch them concurrently
+        with ThreadPoolExecutor(max_workers=max(1, min(5, len(videos)))) as pool:
+            transcripts = list(pool.map(self._get_transcript, [video["id"] for video in videos]))
+        
         # Enrich each video with transcript
         enriched_videos = []
-        for video in videos:
+        for video, transcript in zip(videos, transcripts):
             video_data = {
                 "video_id": video["id"],
                 "title": video["title"],
@@ -59,7 +78,7 @@ class YouTubeFetcher:
                 "url": f"https://www.youtube.com/watch?v={video['id']}",
                 "tags": video.get("tags", []),
                 "view_count": video.get("view_count", 0),
-                "transcript": self._get_transcript(video["id"]),
+                "transcript": transcript,
                 "platform": "YouTube"
             }
             enriched_videos.append(video_data)
@@ -121,19 +140,23 @@ class YouTubeFetcher:
             )
             response = request.execute()
             
+            video_ids = [item["contentDetails"]["videoId"] for item in response.get("items", [])]
+            if not video_ids:
+                return []
+            
+            # Get details for all videos in one call (videos.list takes up to 50 IDs)
+            video_request = self.youtube.videos().list(
+                part="snippet,statistics",
+                id=",".join(video_ids),
+                maxResults=len(video_ids)
+            )
+            video_response = video_request.execute()
+            details = {item["id"]: item for item in video_response.get("items", [])}
+            
             videos = []
-            for item in response.get("items", []):
-                video_id = item["contentDetails"]["videoId"]
-                
-                # Get video details
-                video_request = self.youtube.videos().list(
-                    part="snippet,statistics",
-                    id=video_id
-                )
-                video_response = video_request.execute()
-                
-                if video_response.get("items"):
-                    video_data = video_response["items"][0]
+            for video_id in video_ids:
+                video_data = details.get(video_id)
+                if video_data:
                     videos.append({
                         "id": video_id,
                         "title": video_data["snippet"]["title"],
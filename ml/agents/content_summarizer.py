@@ -3,13 +3,63 @@ Content summarizer - analyzes creator content to extract themes, tone, and style
 """
 
 import os
-from typing import List, Dict
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Optional
 from mistralai import Mistral
 from dotenv import load_dotenv
-import json
+import orjson
+
+from agents.file_cache import FileCache
 
 load_dotenv()
 
+# Summaries are a pure function of the videos, so outreach variants for the
+# same creator (different message_type / collaboration_idea) reuse one LLM
+# analysis. Two tiers: in-process LRU, then a JSON file that survives restarts.
+SUMMARY_CACHE_TTL = 24 * 3600  # seconds
+SUMMARY_CACHE_MAXSIZE = 1024
+_SUMMARY_DISK_CACHE = FileCache("content_summary", ttl=SUMMARY_CACHE_TTL, max_entries=5000)
+_summary_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+
+def _summary_cache_key(content_list: List[Dict]) -> str:
+    ids = "\n".join(item.get("url", "") for item in content_list)
+    return "ytsum:v1:" + hashlib.blake2b(ids.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _summary_cache_get(key: str) -> Optional[Dict]:
+    with _summary_cache_lock:
+        entry = _summary_cache.get(key)
+        if entry is not None:
+            expires_at, summary = entry
+            if expires_at > time.monotonic():
+                _summary_cache.move_to_end(key)
+                return copy.deepcopy(summary)
+            del _summary_cache[key]
+    
+    cached = _SUMMARY_DISK_CACHE.get(key)
+    if cached is None:
+        return None
+    summary, age = cached
+    _summary_cache_set(key, summary, persist=False, ttl=SUMMARY_CACHE_TTL - age)
+    return summary
+
+
+def _summary_cache_set(key: str, summary: Dict, persist: bool = True, ttl: float = SUMMARY_CACHE_TTL) -> None:
+    with _summary_cache_lock:
+        _summary_cache[key] = (time.monotonic() + ttl, copy.deepcopy(summary))
+        _summary_cache.move_to_end(key)
+        while len(_summary_cache) > SUMMARY_CACHE_MAXSIZE:
+            _summary_cache.popitem(last=False)
+    
+    if persist:
+        _SUMMARY_DISK_CACHE.set(key, summary)
+
 
 class ContentSummarizer:
     """Summarize creator content using AI to extract themes and style."""
@@ -148,7 +198,7 @@ IMPORTANT: Return ONLY the JSON, no additional text."""
             else:
                 json_str = analysis_text.strip()
             
-            parsed = json.loads(json_str)
+            parsed = orjson.loads(json_str)
             
             # Ensure all required fields exist
             return {
@@ -207,6 +257,20 @@ IMPORTANT: Return ONLY the JSON, no additional text."""
         }
 
 
+# One summarizer (and Mistral connection pool) per process, created on first use
+_SUMMARIZER: Optional[ContentSummarizer] = None
+_SUMMARIZER_LOCK = threading.Lock()
+
+
+def _get_summarizer() -> ContentSummarizer:
+    global _SUMMARIZER
+    if _SUMMARIZER is None:
+        with _SUMMARIZER_LOCK:
+            if _SUMMARIZER is None:
+                _SUMMARIZER = ContentSummarizer()
+    return _SUMMARIZER
+
+
 # Convenience function
 def summarize_content(content_list: List[Dict]) -> Dict:
     """
@@ -218,5 +282,14 @@ def summarize_content(content_list: List[Dict]) -> Dict:
     Returns:
         Summary dict with themes and insights
     """
-    summarizer = ContentSummarizer()
-    return summarizer.summarize_creator_themes(content_list)
+    key = _summary_cache_key(content_list)
+    cached = _summary_cache_get(key)
+    if cached is not None:
+        return cached
+    
+    summarizer = _get_summarizer()
+    summary = summarizer.summarize_creator_themes(content_list)
+    # Don't pin failed/unparsed analyses for a day
+    if summary.get("main_topics"):
+        _summary_cache_set(key, summary)
+    return summary
@@ -1,13 +1,28 @@
 import os
 import json
+import threading
 from mistralai import Mistral
 from dotenv import load_dotenv
+import orjson
 
 load_dotenv()
 
 # Configuration
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
 
+# One client (and connection pool) for the whole process, created on first use
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_client() -> Mistral:
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = Mistral(api_key=MISTRAL_API_KEY)
+    return _CLIENT
+
 SYSTEM_PROMPT = """You are a professional marketing copywriter.
 
 Your task is to generate marketing content strictly based on the provided campaign strategy.
@@ -81,7 +96,7 @@ def generate_copy(strategy_json: dict) -> dict:
     Returns:
         Dictionary with captions, ad_copy, and blog_ideas
     """
-    client = Mistral(api_key=MISTRAL_API_KEY)
+    client = _get_client()
     user_message = f"Strategy:\n{json.dumps(strategy_json, indent=2)}"
     
     response = client.chat.complete(
@@ -101,4 +116,4 @@ def generate_copy(strategy_json: dict) -> dict:
     elif content.startswith("```"):
         content = content.split("```")[1].split("```")[0].strip()
     
-    return json.loads(content)
+    return orjson.loads(content)
@@ -0,0 +1,104 @@
+"""
+On-disk JSON cache shared by the agents (YouTube discovery, market search,
+content summaries). Entries live under ml/.cache/<namespace>/ whatever the
+working directory, expire by file age and are pruned as new ones are written.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import orjson
+
+CACHE_ROOT = Path(__file__).resolve().parent.parent / ".cache"
+
+# How often (seconds) a cache sweeps its directory for expired entries
+PRUNE_INTERVAL = 600
+
+
+class FileCache:
+    """
+    JSON values keyed by string, one file per key, written atomically.
+    
+    Entries are fresh for `ttl` seconds and kept on disk for `retention`
+    seconds (default: ttl), so callers can still read stale entries, e.g. to
+    revalidate with an ETag. At most `max_entries` files are kept; the oldest
+    go first.
+    """
+    
+    def __init__(self, namespace: str, ttl: float, retention: Optional[float] = None, max_entries: int = 1000):
+        self.dir = CACHE_ROOT / namespace
+        self.ttl = ttl
+        self.retention = max(retention or ttl, ttl)
+        self.max_entries = max_entries
+        self._next_prune = 0.0
+        self._prune_lock = threading.Lock()
+    
+    def _path(self, key: str) -> Path:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return self.dir / f"{digest}.json"
+    
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        """(value, age in seconds) for key, or None if missing, unreadable or older than max_age (default ttl)."""
+        path = self._path(key)
+        try:
+            age = time.time() - path.stat().st_mtime
+            if age >= (self.ttl if max_age is None else max_age):
+                return None
+            return orjson.loads(path.read_bytes()), age
+        except (OSError, ValueError):
+            return None
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store value for key; a failed write is logged and otherwise ignored."""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so a concurrent reader never sees a partial file
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(orjson.dumps(value))
+            os.replace(tmp, path)
+        except (OSError, TypeError) as e:
+            print(f"⚠️  Cache write failed ({self.dir.name}): {e}")
+            return
+    
+        now = time.monotonic()
+        if now >= self._next_prune and self._prune_lock.acquire(blocking=False):
+            try:
+                self._next_prune = now + PRUNE_INTERVAL
+                self.prune()
+            finally:
+                self._prune_lock.release()
+    
+    def prune(self) -> None:
+        """Delete entries past retention (and leftover tmp files), then the oldest beyond max_entries."""
+        now = time.time()
+        entries = []
+        try:
+            with os.scandir(self.dir) as it:
+                for entry in it:
+                    try:
+                        mtime = entry.stat().st_mtime
+                        if entry.name.endswith(".tmp"):
+                            # A live write renames its tmp file within moments
+                            if now - mtime >= PRUNE_INTERVAL:
+                                os.remove(entry.path)
+                        elif now - mtime >= self.retention:
+                            os.remove(entry.path)
+                        else:
+                            entries.append((mtime, entry.path))
+                    except OSError:
+                        continue
+        except OSError:
+            return
+    
+        if len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -2,6 +2,8 @@ import os
 import json
 import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 import logging
@@ -18,6 +20,14 @@ GOOGLE_CX = os.getenv("GOOGLE_CX")  # Google Custom Search Engine ID
 SERPAPI_KEY = os.getenv("SERPAPI_KEY")  # Optional SerpAPI key (fallback)
 
 
+# Shared connection pool so concurrent CSE queries reuse TCP/TLS connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+
+# Max search queries in flight at once (keeps bursts within the CSE quota)
+MAX_CONCURRENT_SEARCHES = 5
+
+
 def search_google(query: str, num: int = 5, country: Optional[str] = None, recent_days: Optional[int] = None) -> List[Dict[str, str]]:
     """
     Search Google using Custom Search API.
@@ -51,7 +61,7 @@ def search_google(query: str, num: int = 5, country: Optional[str] = None, recen
         params["dateRestrict"] = f"d{int(recent_days)}"
 
     try:
-        response = requests.get(url, params=params, timeout=15)
+        response = _SESSION.get(url, params=params, timeout=15)
         response.raise_for_status()
 
         data = response.json()
@@ -73,14 +83,13 @@ def search_google(query: str, num: int = 5, country: Optional[str] = None, recen
         resp = getattr(e, 'response', None)
         if resp is not None:
             try:
-                logger.error(f"Response: {resp.text}")
+                logger.error(f"Response: {resp.content[:200].decode('utf-8', errors='replace')}")
                 if resp.status_code == 403:
                     logger.error("Google Custom Search API returned 403 Forbidden.")
             except ValueError:
                 pass
 
         # Try optional SerpAPI fallback if configured
-        SERPAPI_KEY = os.getenv("SERPAPI_KEY")
         if SERPAPI_KEY:
             logger.info("Attempting fallback to SerpAPI")
             try:
@@ -110,7 +119,7 @@ def serpapi_search(query: str, num: int = 5, country: Optional[str] = None, rece
         params["tbs"] = f"qdr:d{int(recent_days)}"
 
     try:
-        r = requests.get(url, params=params, timeout=15)
+        r = _SESSION.get(url, params=params, timeout=15)
         r.raise_for_status()
         data = r.json()
         items = data.get("organic_results", [])
@@ -128,6 +137,27 @@ def serpapi_search(query: str, num: int = 5, country: Optional[str] = None, rece
         raise
 
 
+# Patterns for actual profile pages (strict matching), compiled once
+_PROFILE_PATTERNS = [re.compile(p) for p in [
+    r'^https?://(www\.)?instagram\.com/[A-Za-z0-9_.-]+/?$',  # Profile only, not /p/ posts
+    r'^https?://(www\.)?tiktok\.com/@[\w\.-]+/?$',  # Profile only, not /video/ posts
+    r'^https?://(www\.)?twitter\.com/[A-Za-z0-9_]+/?$',  # Profile only, not /status/ posts
+    r'^https?://(www\.)?linkedin\.com/in/[A-Za-z0-9-_%]+/?$',  # Profile only
+    r'^https?://(www\.)?youtube\.com/(?:channel/|c/|user/|@)[A-Za-z0-9_\-@]+/?$'  # Channel only
+]]
+
+# Posts/content that should be EXCLUDED, merged into one alternation
+_POST_PATTERN = re.compile('|'.join([
+    r'/p/',  # Instagram posts
+    r'/reel/',  # Instagram reels
+    r'/status/',  # Twitter/X posts
+    r'/Posts/',  # Twitter/X posts page
+    r'/video/',  # TikTok videos
+    r'/watch\?v=',  # YouTube videos
+    r'/post/',  # LinkedIn posts
+]))
+
+
 def _is_profile_link(link: str) -> bool:
     """
     Detect whether a link is an actual social media profile page (not a post).
@@ -137,37 +167,12 @@ def _is_profile_link(link: str) -> bool:
     if not link:
         return False
     
-    # Patterns for actual profile pages (strict matching)
-    profile_patterns = [
-        r'^https?://(www\.)?instagram\.com/[A-Za-z0-9_.-]+/?$',  # Profile only, not /p/ posts
-        r'^https?://(www\.)?tiktok\.com/@[\w\.-]+/?$',  # Profile only, not /video/ posts
-        r'^https?://(www\.)?twitter\.com/[A-Za-z0-9_]+/?$',  # Profile only, not /status/ posts
-        r'^https?://(www\.)?linkedin\.com/in/[A-Za-z0-9-_%]+/?$',  # Profile only
-        r'^https?://(www\.)?youtube\.com/(?:channel/|c/|user/|@)[A-Za-z0-9_\-@]+/?$'  # Channel only
-    ]
-    
-    # Patterns for posts/content that should be EXCLUDED
-    post_patterns = [
-        r'/p/',  # Instagram posts
-        r'/reel/',  # Instagram reels
-        r'/status/',  # Twitter/X posts
-        r'/Posts/',  # Twitter/X posts page
-        r'/video/',  # TikTok videos
-        r'/watch\?v=',  # YouTube videos
-        r'/post/',  # LinkedIn posts
-    ]
-    
     # First check if it's a post (exclude these)
-    for pattern in post_patterns:
-        if re.search(pattern, link):
-            return False
+    if _POST_PATTERN.search(link):
+        return False
     
     # Then check if it matches profile patterns
-    for pattern in profile_patterns:
-        if re.match(pattern, link):
-            return True
-    
-    return False
+    return any(p.match(link) for p in _PROFILE_PATTERNS)
 
 
 def _calculate_relevance_score(result: Dict[str, str], domain: str, audience: str) -> float:
@@ -370,10 +375,15 @@ def find_influencers(
     
     all_results = []
     
-    # Execute searches (limit to 6 queries to save quota)
-    for query in queries[:6]:
-        results = search_google(query, num=num_results, country=country, recent_days=recent_days)
-        all_results.extend(results)
+    def run_query(query: str) -> List[Dict[str, str]]:
+        return search_google(query, num=num_results, country=country, recent_days=recent_days)
+    
+    # Execute searches (limit to 6 queries to save quota); the queries are
+    # independent, so issue them concurrently (map keeps query order for dedup)
+    dispatched = queries[:6]
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_SEARCHES, len(dispatched)) or 1) as pool:
+        for results in pool.map(run_query, dispatched):
+            all_results.extend(results)
     
     # Deduplicate by link
     seen_links = set()
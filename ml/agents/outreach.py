@@ -1,10 +1,115 @@
+import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from mistralai import Mistral
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Per-message-type instructions appended to every outreach prompt (built once)
+MESSAGE_TYPE_INSTRUCTIONS = {
+    "initial_contact": """
+Write a brief, friendly initial outreach message (3-4 sentences max).
+
+TONE: Warm, genuine, like messaging a friend-of-a-friend
+GOAL: Start a conversation, not close a deal
+STRUCTURE:
+- Quick genuine compliment about their specific content
+- Brief mention of why you thought of them
+- Casual question or invitation to chat
+
+DO NOT include formal greetings or signatures. Just the message body.
+""",
+    
+    "casual_dm": """
+Write a super casual Instagram/social media DM (2-3 sentences).
+
+TONE: Like sliding into DMs of someone you admire
+VIBE: Short, punchy, emoji-friendly (use 1-2 relevant emojis MAX)
+GOAL: Get them interested enough to reply
+
+DO NOT sound salesy. Just genuine interest.
+""",
+    
+    "follow_up": """
+Write a brief follow-up message (2-3 sentences).
+
+TONE: Friendly check-in, not pushy
+GOAL: Gentle reminder without being annoying
+STRUCTURE:
+- Acknowledge they're probably busy
+- Quick reminder of what you're about
+- Easy out if not interested
+
+Stay cool and understanding.
+""",
+    
+    "formal_email": """
+Write a professional but warm email.
+
+FORMAT:
+Subject: [Create compelling subject line]
+---
+[Email body]
+
+TONE: Professional yet personable
+STRUCTURE:
+1. Personal greeting and genuine compliment
+2. Brief brand introduction (1-2 sentences)
+3. Why this partnership makes sense for THEM
+4. Specific collaboration idea (keep flexible)
+5. Easy next step
+6. Warm sign-off
+
+LENGTH: 150-200 words MAX. Nobody reads long emails.
+
+Include both Subject line and body, separated by '---'
+""",
+    
+    "partnership_proposal": """
+Write a detailed partnership proposal message.
+
+TONE: Professional but excited
+STRUCTURE:
+1. Genuine appreciation for their work
+2. Brief brand story and mission
+3. Why you see a perfect fit
+4. Specific collaboration concepts (2-3 ideas)
+5. What's in it for them (be specific)
+6. Flexible next steps
+7. Warm close
+
+LENGTH: 200-300 words. Detailed but scannable.
+
+DO NOT include subject line, just the message body.
+"""
+}
+
+
+# Tone rules shared by single and batched outreach prompts
+OUTREACH_RULES = """CRITICAL RULES:
+1. Sound like a real human, not a marketing bot
+2. NO generic templates or copy-paste vibes
+3. Show you actually looked at their content
+4. Focus on mutual value, not just what you want
+5. Keep it conversational and authentic
+6. Don't oversell or sound desperate
+7. Be specific about why YOU reached out to THEM
+8. Make it feel like the start of a friendship, not a transaction
+"""
+
+# Output contract for batched outreach (one JSON object, one entry per influencer)
+BULK_OUTPUT_FORMAT = """OUTPUT FORMAT:
+Return ONLY valid JSON, no additional text:
+{"messages": [{"influencer_number": 1, "subject": "subject line or empty string", "message": "message body only"}]}
+- Exactly one entry per influencer, using the numbers from the list above
+- Put any subject line in "subject" (not in "message"); use "" if the message type has none
+- Each message must be written for that influencer alone - never mention the others
+"""
+
+
 class OutreachGenerator:
     """
     Generates authentic, personalized outreach messages for influencer collaborations.
@@ -17,6 +122,10 @@ class OutreachGenerator:
             raise ValueError("MISTRAL_API_KEY not found in environment variables")
         self.client = Mistral(api_key=api_key)
         self.model = "mistral-large-latest"
+        # Max outreach messages generated concurrently (bounded to stay under Mistral's rate limit)
+        self.max_concurrency = 5
+        # Influencers per batched bulk-outreach call (keeps each JSON response short)
+        self.bulk_batch_size = 10
     
     def generate_outreach_message(
         self,
@@ -103,25 +212,148 @@ class OutreachGenerator:
         """
         Generate outreach messages for multiple influencers.
         
+        Influencers are sent in batches of bulk_batch_size, one LLM call per
+        batch returning every message as JSON. Any influencer the batch call
+        misses (or a failed batch) falls back to an individual call.
+        
         Returns:
             List of dicts with influencer data + outreach message
         """
-        results = []
+        if not influencers:
+            return []
         
-        for influencer in influencers:
-            outreach = self.generate_outreach_message(
+        def generate(influencer):
+            return self.generate_outreach_message(
                 influencer_data=influencer,
                 brand_info=brand_info,
                 message_type=message_type
             )
+        
+        def generate_batch(batch):
+            return self._generate_outreach_batch(batch, brand_info, message_type)
+        
+        if len(influencers) == 1:
+            outreaches = [generate(influencers[0])]
+        else:
+            batches = [
+                influencers[i:i + self.bulk_batch_size]
+                for i in range(0, len(influencers), self.bulk_batch_size)
+            ]
+            # Batches (and fallbacks) are independent round-trips; map keeps input order
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                outreaches = [outreach for batch in pool.map(generate_batch, batches) for outreach in batch]
+                
+                missing = [i for i, outreach in enumerate(outreaches) if outreach is None]
+                if missing:
+                    print(f"Batched outreach missed {len(missing)} influencer(s), generating individually")
+                    for i, outreach in zip(missing, pool.map(generate, [influencers[i] for i in missing])):
+                        outreaches[i] = outreach
+        
+        return [
+            {"influencer": influencer, "outreach": outreach}
+            for influencer, outreach in zip(influencers, outreaches)
+        ]
+    
+    def _generate_outreach_batch(
+        self,
+        influencers: List[Dict],
+        brand_info: Dict,
+        message_type: str
+    ) -> List[Optional[Dict[str, str]]]:
+        """
+        Generate messages for several influencers in one LLM call.
+        
+        Returns one outreach dict per influencer (same shape as
+        generate_outreach_message), or None where the response had no
+        usable message for that influencer.
+        """
+        results: List[Optional[Dict[str, str]]] = [None] * len(influencers)
+        prompt = self._build_bulk_outreach_prompt(influencers, brand_info, message_type)
+        
+        try:
+            response = self.client.chat.complete(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                response_format={"type": "json_object"}
+            )
+            entries = json.loads(response.choices[0].message.content).get("messages", [])
+        except Exception as e:
+            print(f"Batched outreach failed: {e}")
+            return results
+        
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            number = entry.get("influencer_number")
+            body = entry.get("message")
+            if not isinstance(number, int) or not 1 <= number <= len(influencers):
+                continue
+            if results[number - 1] is not None or not isinstance(body, str) or not body.strip():
+                continue
+            
+            subject = entry.get("subject") if isinstance(entry.get("subject"), str) else ""
+            if message_type == "formal_email":
+                if not subject.strip():
+                    subject, body = self._parse_email_format(body)
+            else:
+                subject = f"Collaboration with {brand_info.get('brand_name', 'our brand')}"
             
-            results.append({
-                "influencer": influencer,
-                "outreach": outreach
-            })
+            results[number - 1] = {
+                "subject": subject.strip(),
+                "message": body.strip(),
+                "message_type": message_type,
+                "platform": influencers[number - 1].get("platform", "Unknown")
+            }
         
         return results
     
+    def _build_bulk_outreach_prompt(
+        self,
+        influencers: List[Dict],
+        brand_info: Dict,
+        message_type: str
+    ) -> str:
+        """Build one prompt asking for a separate message per listed influencer."""
+        
+        brand_name = brand_info.get("brand_name", "our brand")
+        product_domain = brand_info.get("product_domain", "our products")
+        target_audience = brand_info.get("target_audience", "our audience")
+        collaboration_idea = brand_info.get("collaboration_idea", "")
+        
+        influencer_list = "\n".join(
+            f"{i}. Name: {influencer.get('name', 'there')} | "
+            f"Platform: {influencer.get('platform', 'social media')} | "
+            f"Content Focus: {influencer.get('niche', influencer.get('snippet', 'your content'))}"
+            for i, influencer in enumerate(influencers, 1)
+        )
+        
+        instruction = MESSAGE_TYPE_INSTRUCTIONS.get(
+            message_type,
+            MESSAGE_TYPE_INSTRUCTIONS["initial_contact"]
+        )
+        
+        return f"""You are a relationship manager reaching out to influencers for authentic collaborations.
+Write a SEPARATE, individually personalized message for EACH influencer below.
+
+INFLUENCERS:
+{influencer_list}
+
+BRAND DETAILS:
+- Brand: {brand_name}
+- Product Category: {product_domain}
+- Target Audience: {target_audience}
+{f'- Collaboration Idea: {collaboration_idea}' if collaboration_idea else ''}
+
+{OUTREACH_RULES}
+INSTRUCTIONS FOR EACH MESSAGE:
+{instruction}
+{BULK_OUTPUT_FORMAT}"""
+    
     def _build_outreach_prompt(
         self,
         influencer_data: Dict,
@@ -172,98 +404,12 @@ BRAND DETAILS:
 - Target Audience: {target_audience}
 {f'- Collaboration Idea: {collaboration_idea}' if collaboration_idea else ''}
 
-CRITICAL RULES:
-1. Sound like a real human, not a marketing bot
-2. NO generic templates or copy-paste vibes
-3. Show you actually looked at their content
-4. Focus on mutual value, not just what you want
-5. Keep it conversational and authentic
-6. Don't oversell or sound desperate
-7. Be specific about why YOU reached out to THEM
-8. Make it feel like the start of a friendship, not a transaction
-"""
+{OUTREACH_RULES}"""
         
-        type_specific_instructions = {
-            "initial_contact": """
-Write a brief, friendly initial outreach message (3-4 sentences max).
-
-TONE: Warm, genuine, like messaging a friend-of-a-friend
-GOAL: Start a conversation, not close a deal
-STRUCTURE:
-- Quick genuine compliment about their specific content
-- Brief mention of why you thought of them
-- Casual question or invitation to chat
-
-DO NOT include formal greetings or signatures. Just the message body.
-""",
-            
-            "casual_dm": """
-Write a super casual Instagram/social media DM (2-3 sentences).
-
-TONE: Like sliding into DMs of someone you admire
-VIBE: Short, punchy, emoji-friendly (use 1-2 relevant emojis MAX)
-GOAL: Get them interested enough to reply
-
-DO NOT sound salesy. Just genuine interest.
-""",
-            
-            "follow_up": """
-Write a brief follow-up message (2-3 sentences).
-
-TONE: Friendly check-in, not pushy
-GOAL: Gentle reminder without being annoying
-STRUCTURE:
-- Acknowledge they're probably busy
-- Quick reminder of what you're about
-- Easy out if not interested
-
-Stay cool and understanding.
-""",
-            
-            "formal_email": """
-Write a professional but warm email.
-
-FORMAT:
-Subject: [Create compelling subject line]
----
-[Email body]
-
-TONE: Professional yet personable
-STRUCTURE:
-1. Personal greeting and genuine compliment
-2. Brief brand introduction (1-2 sentences)
-3. Why this partnership makes sense for THEM
-4. Specific collaboration idea (keep flexible)
-5. Easy next step
-6. Warm sign-off
-
-LENGTH: 150-200 words MAX. Nobody reads long emails.
-
-Include both Subject line and body, separated by '---'
-""",
-            
-            "partnership_proposal": """
-Write a detailed partnership proposal message.
-
-TONE: Professional but excited
-STRUCTURE:
-1. Genuine appreciation for their work
-2. Brief brand story and mission
-3. Why you see a perfect fit
-4. Specific collaboration concepts (2-3 ideas)
-5. What's in it for them (be specific)
-6. Flexible next steps
-7. Warm close
-
-LENGTH: 200-300 words. Detailed but scannable.
-
-DO NOT include subject line, just the message body.
-"""
-        }
         
-        instruction = type_specific_instructions.get(
+        instruction = MESSAGE_TYPE_INSTRUCTIONS.get(
             message_type,
-            type_specific_instructions["initial_contact"]
+            MESSAGE_TYPE_INSTRUCTIONS["initial_contact"]
         )
         
         return base_context + "\n" + instruction
@@ -292,6 +438,20 @@ DO NOT include subject line, just the message body.
             return subject, body
 
 
+# One generator (and Mistral connection pool) per process, created on first use
+_GENERATOR: Optional[OutreachGenerator] = None
+_GENERATOR_LOCK = threading.Lock()
+
+
+def _get_generator() -> OutreachGenerator:
+    global _GENERATOR
+    if _GENERATOR is None:
+        with _GENERATOR_LOCK:
+            if _GENERATOR is None:
+                _GENERATOR = OutreachGenerator()
+    return _GENERATOR
+
+
 def generate_outreach_for_influencer(
     influencer: Dict,
     brand_name: str,
@@ -316,7 +476,7 @@ def generate_outreach_for_influencer(
     Returns:
         Dict with subject and message
     """
-    generator = OutreachGenerator()
+    generator = _get_generator()
     
     brand_info = {
         "brand_name": brand_name,
@@ -355,7 +515,7 @@ def generate_bulk_outreach_messages(
     Returns:
         List of dicts with influencer data + outreach message
     """
-    generator = OutreachGenerator()
+    generator = _get_generator()
     
     brand_info = {
         "brand_name": brand_name,
@@ -4,6 +4,7 @@ Handles both text and PDF inputs, extracts structured strategy with intelligent
 """
 
 import os
+import threading
 import requests
 from io import BytesIO
 from pypdf import PdfReader
@@ -374,14 +375,29 @@ class StrategyParser:
         return result
 
 
+# Shared instance so the Mistral client (and its connection pool) is reused
+_PARSER: Optional[StrategyParser] = None
+_PARSER_LOCK = threading.Lock()
+
+
+def get_strategy_parser() -> StrategyParser:
+    """Return the process-wide StrategyParser, creating it on first use."""
+    global _PARSER
+    if _PARSER is None:
+        with _PARSER_LOCK:
+            if _PARSER is None:
+                _PARSER = StrategyParser()
+    return _PARSER
+
+
 # Convenience function
 def parse_strategy_from_text(text: str) -> Dict[str, Any]:
     """Quick function to parse strategy from text"""
-    parser = StrategyParser()
+    parser = get_strategy_parser()
     return parser.parse_strategy(text, input_type="text")
 
 
 def parse_strategy_from_pdf(pdf_url: str) -> Dict[str, Any]:
     """Quick function to parse strategy from PDF URL"""
-    parser = StrategyParser()
+    parser = get_strategy_parser()
     return parser.parse_strategy(pdf_url, input_type="pdf")
@@ -4,20 +4,221 @@ Generates visual mood boards from campaign strategies using Gemini API
 """
 
 import os
-import requests
 import time
 import base64
-import json
-from typing import Dict, List, Any, Optional
+import functools
+import hashlib
+import io
+import itertools
+import mimetypes
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional
 from mistralai import Mistral
 from dotenv import load_dotenv
 import logging
+import orjson
+
+try:
+    from PIL import Image
+except ImportError:  # Tiles are saved as returned by Gemini
+    Image = None
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Env-driven config, read once at import instead of per VisualAgent()
+MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+if not MISTRAL_API_KEY or not GEMINI_API_KEY:
+    logger.warning("MISTRAL_API_KEY / GEMINI_API_KEY missing - VisualAgent() will fail")
+
+try:
+    from google import genai
+    from google.genai import types as genai_types
+    _GENAI_IMPORT_ERROR = None
+except Exception as e:
+    genai = genai_types = None
+    _GENAI_IMPORT_ERROR = e
+
+# Generated tiles kept in memory per agent (base64 stripped); the disk cache
+# behind it is unbounded, so this only needs to hold the hot entries
+TILE_MEMORY_CACHE_MAXSIZE = 256
+
+# Older Pythons don't map .webp (used for reference images and saved tiles)
+mimetypes.add_type("image/webp", ".webp")
+
+# Matches a JSON object inside an optional ```json fenced block
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+# Static prompt blocks come first so provider-side prefix caching can reuse them;
+# campaign-specific values are appended last.
+_DESCRIPTOR_SYSTEM_PROMPT = """You are a visual creative director. Convert the campaign strategy you are given into visual design language for IMAGE GENERATION.
+
+CRITICAL INSTRUCTIONS FOR "product" FIELD:
+1. Use the DOMAIN to determine the actual product category
+2. If domain is "fashion", the product is CLOTHING/APPAREL (e.g., "jeans", "denim clothing", "fashion apparel")
+3. If domain is "food", the product is FOOD ITEMS
+4. If domain is "tech", the product is ELECTRONIC DEVICES
+5. The product field MUST describe the PHYSICAL ITEM to photograph, NOT the brand name
+6. Example: If brand is "Nike" and domain is "fashion", product = "athletic sneakers"
+7. Example: If brand is "Swasya" and domain is "fashion", product = "sustainable jeans"
+
+EXTRACT VISUAL DESCRIPTORS in JSON format:
+{
+  "product": "PHYSICAL product type based on domain (e.g., 'sustainable jeans', 'eco-friendly denim', 'fashion apparel')",
+  "audience": "target demographic (e.g., 'college students', 'young professionals')",
+  "theme": "one-sentence visual theme combining product and brand values",
+  "colors": ["color1", "color2", "color3"],
+  "lighting": "lighting style (natural/studio/dramatic/soft)",
+  "photography_style": "style (candid/editorial/lifestyle/product)",
+  "tone": "emotional feel (energetic/calm/luxurious/minimal)",
+  "cultural_context": "cultural relevance (if audience is specific region)",
+  "composition": "framing preference (close-up/wide/overhead/portrait)",
+  "prompts": [
+    {"prompt": "ready-to-render image generation prompt", "mood": "one-word mood", "style": "photography style", "type": "user_depicting or product_focus"}
+  ]
+}
+
+CRITICAL INSTRUCTIONS FOR "prompts" FIELD:
+1. Return EXACTLY the requested number of prompts, each a complete, photorealistic commercial photography prompt using the descriptors above
+2. Prompt 1 is MANDATORY: a lifestyle shot of a person from the target audience actively using the product (type "user_depicting")
+3. The remaining prompts are product-focused (type "product_focus"): a close-up hero shot, the product in a lifestyle setting without people, and a creative unique-angle shot
+4. Every prompt must mention the PHYSICAL product, the colors and the lighting
+
+Return ONLY valid JSON, no additional text."""
+
+# Fallback audience → person description for the lifestyle shot (first match wins)
+_AUDIENCE_RULES = [
+    (re.compile(r"college|student", re.IGNORECASE), "young college student, casual outfit, outdoor campus"),
+    (re.compile(r"women|girl", re.IGNORECASE), "young woman, modern casual clothing, natural setting"),
+    (re.compile(r"professional", re.IGNORECASE), "professional person, business casual, office environment"),
+]
+
+# Fallback tile prompts as (template, mood, style, type). Image 1 is the
+# MANDATORY lifestyle shot; images 2-4 are product-focused.
+_PROMPT_TEMPLATES = [
+    (
+        "Professional lifestyle photograph: {audience_descriptor} actively using a {product}, holding it and drinking/using the product, candid authentic moment, genuine happy expression, {lighting}, {colors}, bokeh background, photorealistic, high quality commercial photography, 8k",
+        "authentic", "lifestyle", "user_depicting"
+    ),
+    (
+        "Professional product photography: {product} close-up hero shot, premium quality visible, clean white background or minimal surface, {lighting}, {colors}, studio photography, commercial advertising quality, sharp focus, 8k detail",
+        "premium", "product photography", "product_focus"
+    ),
+    (
+        "Professional commercial photograph: {product} placed in beautiful lifestyle setting related to {audience}, natural environment, aesthetic composition, {colors}, {lighting}, depth of field, editorial style, 8k quality",
+        "aspirational", "editorial", "product_focus"
+    ),
+    (
+        "Creative commercial photograph: {product} from unique angle, artistic composition, {tone} mood, {colors}, dramatic {lighting}, high-end advertising style, magazine quality, 8k resolution",
+        "creative", "cinematic", "product_focus"
+    ),
+]
+
+_TEXT2IMG_PROMPT_PREFIX = """Generate a high-quality, professional commercial image suitable for a marketing mood board.
+High resolution, studio-quality result.
+
+Requirements:"""
+
+_IMG2IMG_PROMPT_PREFIX = """Transform this image. Maintain the product essence but completely reimagine the setting, lighting, and atmosphere.
+Create a professional, commercial-quality image suitable for a marketing mood board.
+High resolution, studio-quality result.
+
+Requirements:"""
+
+
+def _prompt_seed(prompt: str) -> int:
+    """Deterministic 31-bit generation seed derived from the prompt text."""
+    digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big") & 0x7FFFFFFF
+
+
+def _ensure_dir(path: Path) -> Path:
+    """Create a directory if it is missing and return it (cheap when it exists)."""
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_size(size_str: str) -> tuple:
+    """Parse size string like '1024x1024' into (width, height), memoized."""
+    try:
+        width, height = size_str.split("x")
+        return int(width), int(height)
+    except (AttributeError, ValueError):
+        return 1024, 1024
+
+
+# Disambiguates ids minted within one clock tick (time_ns is coarse on Windows)
+_uid_counter = itertools.count()
+
+
+def _uid() -> str:
+    """Hex id for collision-free output filenames: clock, process and a per-process counter."""
+    return f"{time.time_ns():x}-{os.getpid():x}-{next(_uid_counter):x}"
+
+
+class _TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+    
+    Allows bursts of up to `max_rate` calls, refilling at
+    `max_rate / time_period` tokens per second.
+    """
+    
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = max_rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._last) * self.max_rate / self.time_period
+                self._tokens = min(self.max_rate, self._tokens + refill)
+                self._last = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                wait = (1 - self._tokens) * self.time_period / self.max_rate
+            time.sleep(wait)
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+# Process-wide API clients shared by all VisualAgent instances, keyed by
+# (pid, api_key) so forked workers build their own connection pools
+_shared_clients: Dict[tuple, Any] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def _shared_client(kind: str, api_key: str, factory):
+    """Return the cached client for (kind, api_key), creating it on first use."""
+    key = (kind, os.getpid(), api_key)
+    with _shared_clients_lock:
+        if key not in _shared_clients:
+            _shared_clients[key] = factory()
+        return _shared_clients[key]
+
 
 class VisualAgent:
     """
@@ -30,43 +231,76 @@ class VisualAgent:
     """
     
     def __init__(self):
-        mistral_key = os.getenv("MISTRAL_API_KEY")
-        self.gemini_key = os.getenv("GEMINI_API_KEY")
+        self.gemini_key = GEMINI_API_KEY
         
-        if not mistral_key:
+        if not MISTRAL_API_KEY:
             raise ValueError("MISTRAL_API_KEY not found in .env")
         if not self.gemini_key:
             raise ValueError("GEMINI_API_KEY not found in .env")
         
-        self.mistral_client = Mistral(api_key=mistral_key)
+        self.mistral_client = _shared_client(
+            "mistral", MISTRAL_API_KEY, lambda: Mistral(api_key=MISTRAL_API_KEY)
+        )
         self.mistral_model = "mistral-large-latest"
+        self.gemini_model = "gemini-3-pro-image-preview"
         
         # Gemini setup
+        if genai is None:
+            raise ValueError(f"Gemini setup failed: {_GENAI_IMPORT_ERROR}")
+        
         try:
-            from google import genai
-            from google.genai import types
-            
-            # Initialize standard Gemini client
-            self.genai_client = genai.Client(api_key=self.gemini_key)
-            self.genai_types = types
+            # Initialize standard Gemini client (shared across instances)
+            self.genai_client = _shared_client(
+                "gemini", self.gemini_key, lambda: genai.Client(api_key=self.gemini_key)
+            )
+            self.genai_types = genai_types
             logger.info("✓ Gemini client initialized (image generation capable)")
-                
         except Exception as e:
             raise ValueError(f"Gemini setup failed: {e}")
         
-        # Cache for generated images (prevent regeneration)
-        self.image_cache = {}
+        # LRU of generated tiles keyed like the disk cache (prevent regeneration);
+        # the agent is shared process-wide, so it is bounded and locked
+        self.image_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._image_cache_lock = threading.Lock()
+        
+        # Reference images as ready-to-send Gemini parts, keyed by path → (mtime_ns, part)
+        self._ref_image_cache: Dict[str, tuple] = {}
+        
+        # Longest side reference images are shrunk to before upload; tiles are
+        # rendered at 1K, so extra pixels only add upload time to every call
+        self.reference_max_side = 1024
+        
+        # Token bucket sized to Gemini's per-minute quota (shared, as the quota is per key)
+        self._rate_limiter = _shared_client(
+            "gemini_rate", self.gemini_key, lambda: _TokenBucket(max_rate=60, time_period=60)
+        )
+        
+        # Max tiles generated concurrently (image generation is network-bound)
+        self.max_concurrency = 4
+        
+        # Optional (width, height) bound for saved tiles, e.g. (512, 512) for
+        # mood-board cards; None keeps Gemini's full resolution
+        self.thumbnail_size: Optional[tuple] = None
+        
+        # WebP encoder settings for saved tiles
+        self.webp_quality = 85
+        self.webp_method = 4
         
         # Output directory for saved images
-        self.output_dir = "generated_images"
-        os.makedirs(self.output_dir, exist_ok=True)
+        self.output_dir = _ensure_dir(Path("generated_images"))
+        
+        # Persistent content-addressed tile cache (survives restarts)
+        self.cache_dir = _ensure_dir(self.output_dir / ".cache")
     
     def generate_mood_board(
         self,
         strategy: Dict[str, Any],
         num_variations: int = 4,
         image_size: str = "1024x1024",
-        reference_image_path: str = None
+        reference_image_path: str = None,
+        single_shot: bool = False,
+        include_base64: bool = False,
+        save_json: bool = True
     ) -> Dict[str, Any]:
         """
         Generate complete mood board from campaign strategy.
@@ -76,51 +310,50 @@ class VisualAgent:
             num_variations: Number of image variations (default: 4)
             image_size: Image dimensions (default: 1024x1024)
             reference_image_path: Optional path to reference image for image-to-image generation
+            single_shot: Extract descriptors and generate the first tile in one
+                Gemini call instead of a separate Mistral round-trip (text-to-image only)
+            include_base64: Embed each tile's image as a base64 data URI. Off by
+                default; images are always on disk at tile["image_url"]
+            save_json: Persist the mood board JSON (file references only) to
+                output_dir
         
         Returns:
-            Mood board dict with images, prompts, and metadata
+            Mood board dict with images, prompts, and metadata ("json_file"
+            holds the saved JSON path when save_json is set and the write
+            succeeded, else None)
         """
-        logger.info(f"Generating mood board for: {strategy.get('product', 'Unknown')}")
+        product = strategy.get("product", "")
+        audience = strategy.get("audience", "")
+        tone = strategy.get("tone", "")
         
-        # Step 1: Convert strategy to visual language
-        visual_descriptors = self._strategy_to_visual_descriptors(strategy)
+        logger.info(f"Generating mood board for: {product or 'Unknown'}")
         
-        # Step 2: Create prompt variations
-        visual_prompts = self._create_prompt_variations(
-            visual_descriptors,
-            num_variations=num_variations
-        )
+        width, height = _parse_size(image_size)
         
-        # Step 3: Generate images
-        width, height = self._parse_size(image_size)
-        mood_board_tiles = []
+        # Steps 1-2: Convert strategy to visual language and prompt variations
+        visual_descriptors, visual_prompts, mood_board_tiles = self._plan_mood_board(
+            strategy, num_variations, width, height,
+            reference_image_path=reference_image_path,
+            single_shot=single_shot,
+            include_base64=include_base64
+        )
         
-        for i, prompt_data in enumerate(visual_prompts, 1):
-            logger.info(f"Generating image {i}/{len(visual_prompts)}")
-            
-            tile = self._generate_tile(
-                prompt=prompt_data["prompt"],
-                mood=prompt_data["mood"],
-                style=prompt_data["style"],
-                width=width,
-                height=height,
-                tile_id=i,
-                reference_image_path=reference_image_path
-            )
-            
-            if tile:
-                mood_board_tiles.append(tile)
-            
-            # Rate limit handling: wait between requests
-            if i < len(visual_prompts):
-                time.sleep(1)  # 1 second between requests
+        # Step 3: Generate images concurrently (skipping any already produced in single-shot mode)
+        mood_board_tiles.extend(sorted(
+            self._iter_tiles(
+                visual_prompts, {tile["id"] for tile in mood_board_tiles}, width, height,
+                reference_image_path=reference_image_path,
+                include_base64=include_base64
+            ),
+            key=lambda tile: tile["id"]
+        ))
         
         # Step 4: Build mood board structure
         mood_board = {
             "status": "success" if mood_board_tiles else "failed",
-            "product": strategy.get("product", ""),
-            "audience": strategy.get("audience", ""),
-            "tone": strategy.get("tone", ""),
+            "product": product,
+            "audience": audience,
+            "tone": tone,
             "visual_theme": visual_descriptors.get("theme", ""),
             "color_palette": visual_descriptors.get("colors", []),
             "tiles": mood_board_tiles,
@@ -130,18 +363,183 @@ class VisualAgent:
         
         logger.info(f"Mood board complete: {len(mood_board_tiles)}/{num_variations} tiles generated")
         
-        # Save JSON output
-        json_filename = f"mood_board_{int(time.time())}.json"
-        json_filepath = os.path.join(self.output_dir, json_filename)
+        # Save JSON output; callers get the path directly instead of rescanning output_dir
+        if save_json:
+            mood_board["json_file"] = self._save_mood_board(mood_board)
+        
+        return mood_board
+    
+    def generate_mood_board_stream(
+        self,
+        strategy: Dict[str, Any],
+        num_variations: int = 4,
+        image_size: str = "1024x1024",
+        reference_image_path: str = None,
+        include_base64: bool = False,
+        save_json: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Generate a mood board incrementally, yielding events as they are ready.
+        
+        Yields a "header" event (theme, palette), one "tile" event per tile in
+        completion order, then a "done" event with totals. Nothing is held
+        beyond the current tile except base64-free references for the saved JSON.
+        """
+        product = strategy.get("product", "")
+        
+        logger.info(f"Streaming mood board for: {product or 'Unknown'}")
+        
+        width, height = _parse_size(image_size)
+        visual_descriptors, visual_prompts, _ = self._plan_mood_board(
+            strategy, num_variations, width, height,
+            reference_image_path=reference_image_path
+        )
+        
+        yield {
+            "type": "header",
+            "product": product,
+            "audience": strategy.get("audience", ""),
+            "tone": strategy.get("tone", ""),
+            "visual_theme": visual_descriptors.get("theme", ""),
+            "color_palette": visual_descriptors.get("colors", []),
+            "requested": num_variations
+        }
+        
+        tile_refs = []
+        for tile in self._iter_tiles(
+            visual_prompts, set(), width, height,
+            reference_image_path=reference_image_path,
+            include_base64=include_base64
+        ):
+            tile_refs.append({k: v for k, v in tile.items() if k != "base64"})
+            yield {"type": "tile", **tile}
         
+        logger.info(f"Mood board stream complete: {len(tile_refs)}/{num_variations} tiles generated")
+        
+        done = {
+            "type": "done",
+            "status": "success" if tile_refs else "failed",
+            "total_generated": len(tile_refs)
+        }
+        if save_json:
+            done["json_file"] = self._save_mood_board({
+                "status": done["status"],
+                "product": product,
+                "audience": strategy.get("audience", ""),
+                "tone": strategy.get("tone", ""),
+                "visual_theme": visual_descriptors.get("theme", ""),
+                "color_palette": visual_descriptors.get("colors", []),
+                "tiles": sorted(tile_refs, key=lambda tile: tile["id"]),
+                "total_generated": len(tile_refs),
+                "requested": num_variations
+            })
+        yield done
+    
+    def _plan_mood_board(
+        self,
+        strategy: Dict[str, Any],
+        num_variations: int,
+        width: int,
+        height: int,
+        reference_image_path: str = None,
+        single_shot: bool = False,
+        include_base64: bool = False
+    ) -> tuple:
+        """Return (visual_descriptors, visual_prompts, tiles already generated)."""
+        tiles = []
+        if single_shot and not reference_image_path:
+            visual_descriptors, first_tile = self._single_shot_generation(
+                strategy, width, height, num_variations, include_base64=include_base64
+            )
+            if first_tile:
+                tiles.append(first_tile)
+        else:
+            visual_descriptors = self._strategy_to_visual_descriptors(strategy, num_variations)
+        
+        visual_prompts = self._create_prompt_variations(
+            visual_descriptors,
+            num_variations=num_variations
+        )
+        return visual_descriptors, visual_prompts, tiles
+    
+    def _iter_tiles(
+        self,
+        visual_prompts: List[Dict[str, Any]],
+        skip_ids: set,
+        width: int,
+        height: int,
+        reference_image_path: str = None,
+        include_base64: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Generate tiles concurrently, yielding each as soon as it completes."""
+        pending = [
+            (i, prompt_data) for i, prompt_data in enumerate(visual_prompts, 1)
+            if i not in skip_ids
+        ]
+        if not pending:
+            return
+
+        if reference_image_path:
+            # Every tile sends the same reference: load it once here rather than
+            # letting each worker miss the cache and re-read the file at once
+            try:
+                self._reference_image_part(reference_image_path)
+            except OSError as e:
+                logger.warning(f"Could not preload reference image: {e}")
+
+        def generate(item):
+            i, prompt_data = item
+            logger.info(f"Generating image {i}/{len(visual_prompts)}")
+            return self._generate_tile(
+                prompt=prompt_data["prompt"],
+                mood=prompt_data["mood"],
+                style=prompt_data["style"],
+                width=width,
+                height=height,
+                tile_id=i,
+                reference_image_path=reference_image_path,
+                include_base64=include_base64
+            )
+        
+        pool = ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(pending)))
+        try:
+            for future in as_completed([pool.submit(generate, item) for item in pending]):
+                tile = future.result()
+                if tile:
+                    yield tile
+        finally:
+            # Drop queued tiles if the consumer stops early (e.g. client disconnect)
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _save_mood_board(self, mood_board: Dict[str, Any]) -> Optional[str]:
+        """Persist a mood board JSON; returns its path once written, or None on failure."""
+        json_filename = f"mood_board_{_uid()}.json"
+        json_filepath = _ensure_dir(self.output_dir) / json_filename
+        
+        # Persist file references only. Every image_url is immutable: fresh tiles
+        # have unique filenames and cache hits point into cache_dir, so later
+        # boards can't swap the images this JSON refers to
+        persisted = {
+            **mood_board,
+            "tiles": [
+                {k: v for k, v in tile.items() if k != "base64"}
+                for tile in mood_board["tiles"]
+            ]
+        }
+        
+        # Written synchronously (no base64, so it is small) and renamed into
+        # place, so a client opening json_file never sees a partial file
+        tmp_filepath = json_filepath.with_name(f"{json_filename}.{_uid()}.tmp")
         try:
-            with open(json_filepath, 'w', encoding='utf-8') as f:
-                json.dump(mood_board, f, indent=2, ensure_ascii=False)
-            logger.info(f"✓ Mood board JSON saved: {json_filepath}")
+            tmp_filepath.write_bytes(orjson.dumps(persisted, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_filepath, json_filepath)
         except Exception as e:
             logger.error(f"Failed to save JSON: {str(e)}")
+            tmp_filepath.unlink(missing_ok=True)
+            return None
         
-        return mood_board
+        logger.info(f"✓ Mood board JSON saved: {json_filepath}")
+        return str(json_filepath)
     
     def regenerate_tile(
         self,
@@ -150,7 +548,9 @@ class VisualAgent:
         new_mood: Optional[str] = None,
         original_prompt: str = "",
         width: int = 1024,
-        height: int = 1024
+        height: int = 1024,
+        include_base64: bool = False,
+        variation: int = 0
     ) -> Dict[str, Any]:
         """
         Regenerate a single mood board tile with new parameters.
@@ -162,6 +562,9 @@ class VisualAgent:
             original_prompt: Original prompt to modify
             width: Image width
             height: Image height
+            include_base64: Embed the image as a base64 data URI
+            variation: Bump to get a different image for the same prompt
+                (offsets the deterministic seed)
         
         Returns:
             New tile dict
@@ -182,102 +585,161 @@ class VisualAgent:
             style=new_style or "default",
             width=width,
             height=height,
-            tile_id=tile_id
+            tile_id=tile_id,
+            include_base64=include_base64,
+            seed=_prompt_seed(modified_prompt) + variation
         )
     
-    def _strategy_to_visual_descriptors(self, strategy: Dict[str, Any]) -> Dict[str, Any]:
+    def _descriptor_prompt(self, strategy: Dict[str, Any], num_variations: int = 4) -> str:
+        """
+        Build the user message for descriptor extraction.
+        
+        Only the campaign-specific values go here; the static instructions
+        live in _DESCRIPTOR_SYSTEM_PROMPT so providers can cache the prefix.
+        """
+        return f"""CAMPAIGN STRATEGY:
+- Product/Brand: {strategy.get("product", "")}
+- Domain/Category: {strategy.get("domain", "")}
+- Target Audience: {strategy.get("audience", "")}
+- Tone: {strategy.get("tone", "")}
+- Style: {strategy.get("stylistics", "")}
+- Goal: {strategy.get("goal", "")}
+
+Number of prompts: {num_variations}"""
+    
+    def _strategy_to_visual_descriptors(
+        self,
+        strategy: Dict[str, Any],
+        num_variations: int = 4
+    ) -> Dict[str, Any]:
         """
         Convert campaign strategy to visual language using LLM.
         
         Translates abstract concepts (product, audience, tone) into
-        visual descriptors (colors, lighting, style, mood).
+        visual descriptors (colors, lighting, style, mood), plus the
+        ready-to-render image prompts in the same call.
         """
-        product = strategy.get("product", "")
-        audience = strategy.get("audience", "")
-        tone = strategy.get("tone", "")
-        domain = strategy.get("domain", "")
-        stylistics = strategy.get("stylistics", "")
-        goal = strategy.get("goal", "")
-        
-        prompt = f"""You are a visual creative director. Convert this campaign strategy into visual design language for IMAGE GENERATION.
-
-CAMPAIGN STRATEGY:
-- Product/Brand: {product}
-- Domain/Category: {domain}
-- Target Audience: {audience}
-- Tone: {tone}
-- Style: {stylistics}
-- Goal: {goal}
-
-CRITICAL INSTRUCTIONS FOR "product" FIELD:
-1. Use the DOMAIN to determine the actual product category
-2. If domain is "fashion", the product is CLOTHING/APPAREL (e.g., "jeans", "denim clothing", "fashion apparel")
-3. If domain is "food", the product is FOOD ITEMS
-4. If domain is "tech", the product is ELECTRONIC DEVICES
-5. The product field MUST describe the PHYSICAL ITEM to photograph, NOT the brand name
-6. Example: If brand is "Nike" and domain is "fashion", product = "athletic sneakers"
-7. Example: If brand is "Swasya" and domain is "fashion", product = "sustainable jeans"
-
-EXTRACT VISUAL DESCRIPTORS in JSON format:
-{{
-  "product": "PHYSICAL product type based on domain (e.g., 'sustainable jeans', 'eco-friendly denim', 'fashion apparel')",
-  "audience": "target demographic (e.g., 'college students', 'young professionals')",
-  "theme": "one-sentence visual theme combining product and brand values",
-  "colors": ["color1", "color2", "color3"],
-  "lighting": "lighting style (natural/studio/dramatic/soft)",
-  "photography_style": "style (candid/editorial/lifestyle/product)",
-  "tone": "emotional feel (energetic/calm/luxurious/minimal)",
-  "cultural_context": "cultural relevance (if audience is specific region)",
-  "composition": "framing preference (close-up/wide/overhead/portrait)"
-}}
-
-Return ONLY valid JSON, no additional text."""
+        prompt = self._descriptor_prompt(strategy, num_variations)
         
         try:
             response = self.mistral_client.chat.complete(
                 model=self.mistral_model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[
+                    {"role": "system", "content": _DESCRIPTOR_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
             )
             
-            import json
             response_text = response.choices[0].message.content
             
-            # Extract JSON from response
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                json_str = response_text.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
+            # Extract JSON from response (tolerating a fenced block)
+            match = _JSON_FENCE_RE.search(response_text)
+            json_str = match.group(1) if match else response_text.strip()
             
-            descriptors = json.loads(json_str)
+            descriptors = orjson.loads(json_str)
             logger.info(f"Visual descriptors extracted - Product: {descriptors.get('product')}, Theme: {descriptors.get('theme', 'N/A')}")
             
             return descriptors
         
         except Exception as e:
             logger.error(f"Error generating visual descriptors: {e}")
-            # Fallback: Use domain to infer product type
-            product_type = product
-            if domain:
-                if domain.lower() in ["fashion", "apparel", "clothing"]:
-                    product_type = "sustainable jeans and denim clothing"
-                elif domain.lower() in ["food", "beverage"]:
-                    product_type = "food products"
-                elif domain.lower() in ["tech", "technology"]:
-                    product_type = "tech products"
+            return self._fallback_descriptors(strategy)
+    
+    def _fallback_descriptors(self, strategy: Dict[str, Any]) -> Dict[str, Any]:
+        """Fallback descriptors: use domain to infer product type."""
+        product = strategy.get("product", "")
+        audience = strategy.get("audience", "")
+        tone = strategy.get("tone", "")
+        domain = strategy.get("domain", "")
+        
+        product_type = product
+        if domain:
+            if domain.lower() in ["fashion", "apparel", "clothing"]:
+                product_type = "sustainable jeans and denim clothing"
+            elif domain.lower() in ["food", "beverage"]:
+                product_type = "food products"
+            elif domain.lower() in ["tech", "technology"]:
+                product_type = "tech products"
+        
+        return {
+            "product": product_type,
+            "audience": audience,
+            "theme": f"{product_type} for {audience}",
+            "colors": ["vibrant", "modern"],
+            "lighting": "natural",
+            "photography_style": "lifestyle",
+            "tone": tone,
+            "cultural_context": "universal",
+            "composition": "balanced"
+        }
+    
+    def _single_shot_generation(
+        self,
+        strategy: Dict[str, Any],
+        width: int,
+        height: int,
+        num_variations: int = 4,
+        include_base64: bool = False
+    ) -> tuple:
+        """
+        Extract visual descriptors and generate tile 1 in a single Gemini call.
+        
+        Gemini returns the descriptor JSON as a text part and the lifestyle
+        image as an image part of the same response, saving the separate
+        Mistral round-trip. Falls back to the two-step path on failure.
+        
+        Returns:
+            (descriptors, tile) - tile is None if no image came back
+        """
+        prompt = self._descriptor_prompt(strategy, num_variations) + """
+
+THEN, in the same response, generate IMAGE 1: a professional lifestyle photograph of a person from the target audience actively using the product, matching the descriptors above. Candid authentic moment, photorealistic, high quality commercial photography."""
+        
+        try:
+            with self._rate_limiter:
+                response = self.genai_client.models.generate_content(
+                    model=self.gemini_model,
+                    contents=[prompt],
+                    config=self.genai_types.GenerateContentConfig(
+                        system_instruction=_DESCRIPTOR_SYSTEM_PROMPT,
+                        response_modalities=["TEXT", "IMAGE"],
+                        image_config=self.genai_types.ImageConfig(
+                            aspect_ratio="1:1",
+                            image_size="1K"
+                        )
+                    )
+                )
             
-            return {
-                "product": product_type,
-                "audience": audience,
-                "theme": f"{product_type} for {audience}",
-                "colors": ["vibrant", "modern"],
-                "lighting": "natural",
-                "photography_style": "lifestyle",
-                "tone": tone,
-                "cultural_context": "universal",
-                "composition": "balanced"
-            }
+            response_text = "".join(
+                part.text for part in getattr(response, "parts", [])
+                if getattr(part, "text", None)
+            )
+            match = _JSON_FENCE_RE.search(response_text)
+            descriptors = orjson.loads(match.group(1) if match else response_text.strip())
+            logger.info(f"Single-shot descriptors extracted - Product: {descriptors.get('product')}")
+        
+        except Exception as e:
+            logger.error(f"Single-shot generation failed, using two-step path: {e}")
+            return self._strategy_to_visual_descriptors(strategy, num_variations), None
+        
+        first_prompt = self._create_prompt_variations(descriptors, num_variations=1)[0]
+        tile = self._tile_from_response(
+            response,
+            prompt=first_prompt["prompt"],
+            mood=first_prompt["mood"],
+            style=first_prompt["style"],
+            width=width,
+            height=height,
+            tile_id=1,
+            provider="gemini_single_shot",
+            include_base64=include_base64
+        )
+        
+        # Not cached: this image came from the fused descriptor prompt at the
+        # fixed 1K size, not from first_prompt/seed/width x height, so it must
+        # not answer a later two-step request for those parameters
+        return descriptors, tile
     
     def _create_prompt_variations(
         self,
@@ -287,72 +749,48 @@ Return ONLY valid JSON, no additional text."""
         """
         Create multiple visual prompt variations from descriptors.
         
-        Generates diverse prompts:
+        Uses the LLM-written prompts from the descriptor call when present;
+        otherwise falls back to templated prompts:
         - Image 1: MANDATORY lifestyle shot (person using product)
         - Images 2-4: Product-focused shots with different angles/moods
         """
+        llm_prompts = [
+            {
+                "prompt": p["prompt"],
+                "mood": p.get("mood") or "default",
+                "style": p.get("style") or "default",
+                "type": p.get("type") or "product_focus"
+            }
+            for p in descriptors.get("prompts") or []
+            if isinstance(p, dict) and p.get("prompt")
+        ]
+        if len(llm_prompts) >= num_variations:
+            return llm_prompts[:num_variations]
+        
         # Extract key info
-        product = descriptors.get("product", "product")
-        audience = descriptors.get("audience", "people")
-        theme = descriptors.get("theme", "")
         colors = ", ".join(descriptors.get("colors", ["natural tones"]))
-        lighting = descriptors.get("lighting", "natural daylight")
-        tone = descriptors.get("tone", "friendly")
-        
-        variations = []
-        
-        # IMAGE 1: MANDATORY - Lifestyle shot with target audience USING the product
-        # Be very specific about showing the product being used
-        audience_descriptor = ""
-        if "college" in audience.lower() or "student" in audience.lower():
-            audience_descriptor = "young college student, casual outfit, outdoor campus"
-        elif "women" in audience.lower() or "girl" in audience.lower():
-            audience_descriptor = "young woman, modern casual clothing, natural setting"
-        elif "professional" in audience.lower():
-            audience_descriptor = "professional person, business casual, office environment"
-        else:
-            audience_descriptor = "person from target demographic"
-        
-        lifestyle_prompt = f"Professional lifestyle photograph: {audience_descriptor} actively using a {product}, holding it and drinking/using the product, candid authentic moment, genuine happy expression, {lighting}, {colors}, bokeh background, photorealistic, high quality commercial photography, 8k"
-        
-        variations.append({
-            "prompt": lifestyle_prompt,
-            "mood": "authentic",
-            "style": "lifestyle",
-            "type": "user_depicting"
-        })
-        
-        # IMAGE 2: Product close-up hero shot
-        product_hero = f"Professional product photography: {product} close-up hero shot, premium quality visible, clean white background or minimal surface, {lighting}, {colors}, studio photography, commercial advertising quality, sharp focus, 8k detail"
-        
-        variations.append({
-            "prompt": product_hero,
-            "mood": "premium",
-            "style": "product photography",
-            "type": "product_focus"
-        })
-        
-        # IMAGE 3: Product in lifestyle context (without person)
-        context_shot = f"Professional commercial photograph: {product} placed in beautiful lifestyle setting related to {audience}, natural environment, aesthetic composition, {colors}, {lighting}, depth of field, editorial style, 8k quality"
-        
-        variations.append({
-            "prompt": context_shot,
-            "mood": "aspirational",
-            "style": "editorial",
-            "type": "product_focus"
-        })
+        audience = descriptors.get("audience", "people")
         
-        # IMAGE 4: Creative product shot
-        creative_shot = f"Creative commercial photograph: {product} from unique angle, artistic composition, {tone} mood, {colors}, dramatic {lighting}, high-end advertising style, magazine quality, 8k resolution"
+        # IMAGE 1 must show the target audience USING the product, so pick
+        # the most specific person description that matches the audience
+        audience_descriptor = next(
+            (descriptor for pattern, descriptor in _AUDIENCE_RULES if pattern.search(audience)),
+            "person from target demographic"
+        )
         
-        variations.append({
-            "prompt": creative_shot,
-            "mood": "creative",
-            "style": "cinematic",
-            "type": "product_focus"
-        })
+        context = {
+            "product": descriptors.get("product", "product"),
+            "audience": audience,
+            "audience_descriptor": audience_descriptor,
+            "colors": colors,
+            "lighting": descriptors.get("lighting", "natural daylight"),
+            "tone": descriptors.get("tone", "friendly")
+        }
         
-        return variations[:num_variations]
+        return [
+            {"prompt": template.format(**context), "mood": mood, "style": style, "type": tile_type}
+            for template, mood, style, tile_type in _PROMPT_TEMPLATES[:num_variations]
+        ]
     
     def _generate_tile(
         self,
@@ -362,36 +800,149 @@ Return ONLY valid JSON, no additional text."""
         width: int = 1024,
         height: int = 1024,
         tile_id: Optional[int] = None,
-        reference_image_path: str = None
+        reference_image_path: str = None,
+        include_base64: bool = False,
+        seed: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Generate a single mood board tile using Gemini.
         
         If reference_image_path is provided, uses image-to-image.
-        Otherwise uses text-to-image.
+        Otherwise uses text-to-image. The seed defaults to one derived from
+        the prompt, so identical requests are reproducible and cacheable.
         """
-        # Check cache
-        cache_key = f"{prompt}_{width}x{height}_{reference_image_path or 'text2img'}"
-        if cache_key in self.image_cache:
+        if seed is None:
+            seed = _prompt_seed(prompt)
+        
+        # Check cache (same key as disk: includes model and reference mtime)
+        cache_key = self._cache_key(prompt, mood, style, width, height, self.gemini_model, reference_image_path, seed)
+        tile = self._image_cache_get(cache_key)
+        if tile:
             logger.info("Using cached image")
-            return self.image_cache[cache_key]
+            return self._with_base64({**tile, "id": tile_id}, include_base64)
         
-        # Use Gemini for generation
-        if reference_image_path:
-            # Image-to-image generation
-            tile = self._gemini_image_to_image(prompt, mood, style, width, height, tile_id, reference_image_path)
-        else:
-            # Text-to-image generation
-            tile = self._gemini_text_to_image(prompt, mood, style, width, height, tile_id)
+        tile = self._load_cached_tile(cache_key, tile_id)
+        if tile:
+            logger.info(f"Using disk-cached image: {tile['image_url']}")
+            self._image_cache_set(cache_key, tile)
+            return self._with_base64(tile, include_base64)
+        
+        # Use Gemini for generation (rate limited by token bucket)
+        with self._rate_limiter:
+            if reference_image_path:
+                # Image-to-image generation
+                tile = self._gemini_image_to_image(
+                    prompt, mood, style, width, height, tile_id, reference_image_path,
+                    include_base64=include_base64,
+                    seed=seed
+                )
+            else:
+                # Text-to-image generation
+                tile = self._gemini_text_to_image(
+                    prompt, mood, style, width, height, tile_id,
+                    include_base64=include_base64,
+                    seed=seed
+                )
         
         if tile:
-            # Cache it
-            self.image_cache[cache_key] = tile
+            # Cache it; the memory entry points at the immutable cache-dir copy
+            cached_path = self._store_cached_tile(cache_key, tile)
+            if cached_path:
+                self._image_cache_set(cache_key, {**tile, "image_url": cached_path})
             return tile
         
         logger.error("Failed to generate tile")
         return None
     
+    def _cache_key(
+        self,
+        prompt: str,
+        mood: str,
+        style: str,
+        width: int,
+        height: int,
+        model: str,
+        reference_image_path: Optional[str] = None,
+        seed: Optional[int] = None
+    ) -> str:
+        """
+        Content-addressed cache key for a tile's generation parameters. Mood
+        and style are part of it because they end up in the tile's metadata
+        and filename, not only in the prompt.
+        """
+        reference = "text2img"
+        if reference_image_path:
+            try:
+                reference = f"{reference_image_path}@{os.stat(reference_image_path).st_mtime_ns}"
+            except OSError:
+                reference = reference_image_path
+        
+        payload = "\x1f".join([
+            prompt.strip(), mood, style, f"{width}x{height}", model, reference, str(seed), str(self.thumbnail_size)
+        ])
+        return hashlib.blake2b(payload.encode("utf-8")).hexdigest()[:32]
+    
+    def _image_cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._image_cache_lock:
+            tile = self.image_cache.get(key)
+            if tile is not None:
+                self.image_cache.move_to_end(key)
+            return tile
+    
+    def _image_cache_set(self, key: str, tile: Dict[str, Any]) -> None:
+        # base64 is re-read from image_url on demand, never held in memory
+        with self._image_cache_lock:
+            self.image_cache[key] = {**tile, "base64": None}
+            self.image_cache.move_to_end(key)
+            while len(self.image_cache) > TILE_MEMORY_CACHE_MAXSIZE:
+                self.image_cache.popitem(last=False)
+    
+    def _load_cached_tile(self, key: str, tile_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Rebuild a tile from the on-disk cache, or return None on a miss."""
+        meta_path = self.cache_dir / f"{key}.json"
+        
+        try:
+            tile = orjson.loads(meta_path.read_bytes())
+            image_path = self.cache_dir / tile.pop("cache_file")
+            if not image_path.exists():
+                return None
+        except (OSError, ValueError, KeyError):
+            return None
+        
+        tile["id"] = tile_id
+        tile["image_url"] = image_path.as_posix()
+        tile["base64"] = None
+        return tile
+    
+    def _store_cached_tile(self, key: str, tile: Dict[str, Any]) -> Optional[str]:
+        """
+        Atomically write a tile's image and metadata sidecar into the cache.
+        Returns the cached image's path, or None if the write failed.
+        """
+        source = Path(tile["image_url"])
+        image_path = _ensure_dir(self.cache_dir) / f"{key}{source.suffix}"
+        meta_path = self.cache_dir / f"{key}.json"
+        
+        metadata = {k: v for k, v in tile.items() if k not in ("base64", "image_url")}
+        metadata["cache_file"] = image_path.name
+        
+        try:
+            # copyfile uses an in-kernel copy (sendfile) instead of reading the
+            # image back into Python. A copy rather than a hard link, so
+            # clearing generated_images/ leaves the cache intact.
+            tmp_image = image_path.with_name(f"{image_path.name}.{_uid()}.tmp")
+            shutil.copyfile(source, tmp_image)
+            os.replace(tmp_image, image_path)
+            
+            tmp_meta = meta_path.with_name(f"{meta_path.name}.{_uid()}.tmp")
+            tmp_meta.write_bytes(orjson.dumps(metadata))
+            os.replace(tmp_meta, meta_path)
+        except OSError as e:
+            logger.warning(f"Failed to write tile cache: {str(e)}")
+            return None
+        
+        return image_path.as_posix()
+    
     def _gemini_text_to_image(
         self,
         prompt: str,
@@ -399,7 +950,9 @@ Return ONLY valid JSON, no additional text."""
         style: str,
         width: int,
         height: int,
-        tile_id: Optional[int]
+        tile_id: Optional[int],
+        include_base64: bool = False,
+        seed: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Text-to-image generation using Gemini generate_content.
@@ -410,21 +963,19 @@ Return ONLY valid JSON, no additional text."""
             logger.info(f"Gemini text-to-image generation...")
             
             # Create generation prompt
-            generation_prompt = f"""Generate a high-quality, professional commercial image:
-- Content: {prompt}
+            generation_prompt = f"""{_TEXT2IMG_PROMPT_PREFIX}
 - Mood: {mood}
 - Style: {style}
-
-Create a professional, commercial-quality image suitable for a marketing mood board.
-High resolution, studio-quality result."""
+- Content: {prompt}"""
             
-            logger.info(f"Generating with prompt: {generation_prompt[:100]}...")
+            logger.info(f"Generating with prompt: {prompt[:100]}...")
             
             # Generate content with text input only
             response = self.genai_client.models.generate_content(
-                model="gemini-3-pro-image-preview",
+                model=self.gemini_model,
                 contents=[generation_prompt],
                 config=self.genai_types.GenerateContentConfig(
+                    seed=seed,
                     image_config=self.genai_types.ImageConfig(
                         aspect_ratio="1:1",
                         image_size="1K"
@@ -432,53 +983,19 @@ High resolution, studio-quality result."""
                 )
             )
             
-            # Extract image from response
-            image_parts = [
-                part for part in getattr(response, "parts", [])
-                if hasattr(part, "inline_data") and 
-                   getattr(part.inline_data, "mime_type", "").startswith("image/")
-            ]
-            
-            if not image_parts:
-                logger.warning("No image returned by Gemini")
-                return None
-            
-            # Get image bytes
-            image_bytes = image_parts[0].inline_data.data
-            
-            # Save image
-            filename = f"tile_{tile_id or int(time.time())}_{mood}_{style.replace(' ', '_')}_gemini.jpg"
-            filepath = os.path.join(self.output_dir, filename)
-            
-            with open(filepath, 'wb') as f:
-                f.write(image_bytes)
-            
-            image_url = f"{self.output_dir}/{filename}"
-            
-            # Convert to base64
-            base64_data = self._image_to_base64(filepath)
-            
-            tile = {
-                "id": tile_id,
-                "prompt": prompt,
-                "mood": mood,
-                "style": style,
-                "image_url": image_url,
-                "base64": base64_data,
-                "image_size": len(image_bytes),
-                "width": width,
-                "height": height,
-                "generated_at": time.time(),
-                "provider": "gemini_text2img"
-            }
+            tile = self._tile_from_response(
+                response, prompt, mood, style, width, height, tile_id,
+                provider="gemini_text2img",
+                include_base64=include_base64,
+                seed=seed
+            )
             
-            logger.info(f"✓ Gemini text-to-image success: {filepath} ({len(image_bytes)/1024:.1f} KB)")
+            if tile:
+                logger.info(f"✓ Gemini text-to-image success: {tile['image_url']} ({tile['image_size']/1024:.1f} KB)")
             return tile
             
-        except Exception as e:
-            logger.error(f"Gemini text-to-image failed: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Gemini text-to-image failed")
             return None
     
     def _gemini_image_to_image(
@@ -489,7 +1006,9 @@ High resolution, studio-quality result."""
         width: int,
         height: int,
         tile_id: Optional[int],
-        reference_image_path: str
+        reference_image_path: str,
+        include_base64: bool = False,
+        seed: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Image-to-image generation using Gemini generate_content with image input.
@@ -501,105 +1020,229 @@ High resolution, studio-quality result."""
             return None
         
         try:
-            from PIL import Image
-            
             logger.info(f"Gemini img2img with reference: {reference_image_path}")
             
-            # Load reference image using PIL
-            with Image.open(reference_image_path) as img:
-                # Create transformation prompt
-                transform_prompt = f"""Transform this image with the following requirements:
+            # Load reference image (read once, shared by all tiles)
+            reference_part = self._reference_image_part(reference_image_path)
+            
+            # Create transformation prompt
+            transform_prompt = f"""{_IMG2IMG_PROMPT_PREFIX}
 - Mood: {mood}
 - Style: {style}
-- Content: {prompt}
-
-Maintain the product essence but completely reimagine the setting, lighting, and atmosphere.
-Create a professional, commercial-quality image suitable for a marketing mood board.
-High resolution, studio-quality result."""
-                
-                logger.info(f"Generating with prompt: {transform_prompt[:100]}...")
-                
-                # Generate content with image input
-                response = self.genai_client.models.generate_content(
-                    model="gemini-3-pro-image-preview",
-                    contents=[transform_prompt, img],
-                    config=self.genai_types.GenerateContentConfig(
-                        image_config=self.genai_types.ImageConfig(
-                            aspect_ratio="1:1",
-                            image_size="1K"
-                        )
-                    )
-                )
-            
-            # Extract image from response
-            image_parts = [
-                part for part in getattr(response, "parts", [])
-                if hasattr(part, "inline_data") and 
-                   getattr(part.inline_data, "mime_type", "").startswith("image/")
-            ]
-            
-            if not image_parts:
-                logger.warning("No image returned by Gemini")
-                return None
-            
-            # Get image bytes
-            image_bytes = image_parts[0].inline_data.data
-            
-            # Save image
-            filename = f"tile_{tile_id or int(time.time())}_{mood}_{style.replace(' ', '_')}_gemini.jpg"
-            filepath = os.path.join(self.output_dir, filename)
+- Content: {prompt}"""
             
-            with open(filepath, 'wb') as f:
-                f.write(image_bytes)
+            logger.info(f"Generating with prompt: {prompt[:100]}...")
             
-            image_url = f"{self.output_dir}/{filename}"
-            
-            # Convert to base64
-            base64_data = self._image_to_base64(filepath)
+            # Generate content with image input
+            response = self.genai_client.models.generate_content(
+                model=self.gemini_model,
+                contents=[transform_prompt, reference_part],
+                config=self.genai_types.GenerateContentConfig(
+                    seed=seed,
+                    image_config=self.genai_types.ImageConfig(
+                        aspect_ratio="1:1",
+                        image_size="1K"
+                    )
+                )
+            )
             
-            tile = {
-                "id": tile_id,
-                "prompt": prompt,
-                "mood": mood,
-                "style": style,
-                "image_url": image_url,
-                "base64": base64_data,
-                "image_size": len(image_bytes),
-                "width": width,
-                "height": height,
-                "generated_at": time.time(),
-                "provider": "gemini_img2img",
-                "reference_image": reference_image_path
-            }
+            tile = self._tile_from_response(
+                response, prompt, mood, style, width, height, tile_id,
+                provider="gemini_img2img",
+                include_base64=include_base64,
+                seed=seed,
+                reference_image=reference_image_path
+            )
             
-            logger.info(f"✓ Gemini img2img success: {filepath} ({len(image_bytes)/1024:.1f} KB)")
+            if tile:
+                logger.info(f"✓ Gemini img2img success: {tile['image_url']} ({tile['image_size']/1024:.1f} KB)")
             return tile
             
+        except Exception:
+            logger.exception("Gemini img2img failed")
+            return None
+    
+    def _reference_image_part(self, reference_image_path: str) -> Any:
+        """
+        Return the reference image as a Gemini Part, cached by path and mtime.
+        
+        The image is prepared once (see _prepare_reference) and the encoded
+        bytes are reused for every tile, so it is never decoded or re-encoded
+        per tile, and the cached part is safe to share across the tile worker
+        threads.
+        """
+        mtime_ns = os.stat(reference_image_path).st_mtime_ns
+        cached = self._ref_image_cache.get(reference_image_path)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        
+        mime_type = mimetypes.guess_type(reference_image_path)[0] or "image/jpeg"
+        data, mime_type = self._prepare_reference(Path(reference_image_path).read_bytes(), mime_type)
+        part = self.genai_types.Part.from_bytes(data=data, mime_type=mime_type)
+        self._ref_image_cache[reference_image_path] = (mtime_ns, part)
+        return part
+    
+    def _prepare_reference(self, image_bytes: bytes, mime_type: str) -> tuple:
+        """
+        Downscale an oversized reference image to reference_max_side (WebP).
+        
+        Returns (image_bytes, mime_type). Images already within bounds, or
+        that PIL cannot decode, are returned unchanged.
+        """
+        if Image is None or not self.reference_max_side:
+            return image_bytes, mime_type
+        
+        bound = (self.reference_max_side, self.reference_max_side)
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                if max(img.size) <= self.reference_max_side:
+                    return image_bytes, mime_type
+                img.draft("RGB", bound)
+                img.thumbnail(bound)
+                buffer = io.BytesIO()
+                img.save(buffer, "WEBP", quality=self.webp_quality, method=self.webp_method)
+            logger.info(f"Reference image downscaled to {img.size[0]}x{img.size[1]} for upload")
+            return buffer.getvalue(), "image/webp"
         except Exception as e:
-            logger.error(f"Gemini img2img failed: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.warning(f"Reference downscale skipped: {str(e)}")
+            return image_bytes, mime_type
+    
+    def _tile_from_response(
+        self,
+        response: Any,
+        prompt: str,
+        mood: str,
+        style: str,
+        width: int,
+        height: int,
+        tile_id: Optional[int],
+        provider: str,
+        include_base64: bool = False,
+        **extra: Any
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Extract the first image part of a Gemini response, save it,
+        and build the tile dict.
+        """
+        # Extract image from response
+        image_parts = [
+            part for part in getattr(response, "parts", [])
+            if hasattr(part, "inline_data") and 
+               getattr(part.inline_data, "mime_type", "").startswith("image/")
+        ]
+        
+        if not image_parts:
+            logger.warning("No image returned by Gemini")
             return None
+        
+        # Get image bytes (recompressed to WebP)
+        image_bytes, mime_type, recompressed = self._to_webp(
+            image_parts[0].inline_data.data,
+            image_parts[0].inline_data.mime_type
+        )
+        
+        # Save image
+        extension = mime_type.split("/")[-1].replace("jpeg", "jpg")
+        # Mood/style may be LLM-written, so keep only filename-safe characters
+        safe_mood = re.sub(r"[^\w-]+", "_", mood)
+        safe_style = re.sub(r"[^\w-]+", "_", style)
+        # Unique per call so later or concurrent boards never overwrite this one's tiles
+        filename = f"tile_{tile_id}_{_uid()}_{safe_mood}_{safe_style}_gemini.{extension}"
+        filepath = _ensure_dir(self.output_dir) / filename
+        filepath.write_bytes(image_bytes)
+        
+        image_url = filepath.as_posix()
+        
+        # Convert to base64 (opt-in)
+        base64_data = self._image_to_base64(image_bytes, mime_type) if include_base64 else None
+        
+        tile = {
+            "id": tile_id,
+            "prompt": prompt,
+            "mood": mood,
+            "style": style,
+            "image_url": image_url,
+            "base64": base64_data,
+            "image_size": len(image_bytes),
+            "mime_type": mime_type,
+            "width": width,
+            "height": height,
+            "generated_at": time.time(),
+            "provider": f"{provider}+webp" if recompressed else provider,
+            **extra
+        }
+        
+        return tile
     
-    def _image_to_base64(self, filepath: str) -> str:
-        """Convert image file to base64 string with data URI prefix."""
+    def get_tile_base64(self, tile: Dict[str, Any]) -> str:
+        """Read a tile's saved image on demand and return it as a base64 data URI."""
         try:
-            with open(filepath, 'rb') as f:
-                image_bytes = f.read()
-            base64_string = base64.b64encode(image_bytes).decode('utf-8')
-            # Add data URI prefix for direct HTML embedding
-            return f"data:image/jpeg;base64,{base64_string}"
+            image_bytes = Path(tile["image_url"]).read_bytes()
         except Exception as e:
             logger.error(f"Failed to convert image to base64: {str(e)}")
             return ""
+        return self._image_to_base64(image_bytes, tile.get("mime_type", "image/jpeg"))
+    
+    def _with_base64(self, tile: Dict[str, Any], include_base64: bool) -> Dict[str, Any]:
+        """Return the tile with base64 attached or stripped to match the request."""
+        if include_base64 and not tile.get("base64"):
+            return {**tile, "base64": self.get_tile_base64(tile)}
+        if not include_base64 and tile.get("base64"):
+            return {**tile, "base64": None}
+        return tile
+    
+    def _to_webp(self, image_bytes: bytes, mime_type: str = "image/jpeg") -> tuple:
+        """
+        Recompress image bytes to WebP for smaller files and payloads.
+        
+        Downscales to thumbnail_size first when set. Returns (image_bytes,
+        mime_type, recompressed). Images that are already WebP (and need no
+        resize), or that PIL cannot decode, are returned unchanged.
+        Recompressed data is a memoryview over the encoder's buffer, avoiding
+        a full copy of the image.
+        """
+        if Image is None or (mime_type == "image/webp" and not self.thumbnail_size):
+            return image_bytes, mime_type, False
+        
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                if self.thumbnail_size:
+                    # In-place, aspect-preserving; draft() lets JPEG decode at reduced scale
+                    img.draft("RGB", self.thumbnail_size)
+                    img.thumbnail(self.thumbnail_size)
+                buffer = io.BytesIO()
+                img.save(buffer, "WEBP", quality=self.webp_quality, method=self.webp_method)
+            return buffer.getbuffer(), "image/webp", True
+        except Exception as e:
+            logger.warning(f"WebP recompression skipped: {str(e)}")
+            return image_bytes, mime_type, False
+    
+    def _image_to_base64(self, image_bytes: bytes, mime_type: str = "image/jpeg") -> str:
+        """Convert image bytes to base64 string with data URI prefix."""
+        # base64 output is pure ASCII, so skip UTF-8 validation
+        base64_string = base64.b64encode(image_bytes).decode('ascii')
+        # Add data URI prefix for direct HTML embedding
+        return f"data:{mime_type};base64,{base64_string}"
     
     def _parse_size(self, size_str: str) -> tuple:
         """Parse size string like '1024x1024' into (width, height)."""
-        try:
-            width, height = size_str.split("x")
-            return int(width), int(height)
-        except:
-            return 1024, 1024
+        return _parse_size(size_str)
+
+
+# Shared instance: clients, rate limiter and tile caches persist across callers
+_VISUAL_AGENT: Optional[VisualAgent] = None
+_VISUAL_AGENT_LOCK = threading.Lock()
+
+
+def get_visual_agent() -> VisualAgent:
+    """Return the process-wide VisualAgent, creating it on first use."""
+    global _VISUAL_AGENT
+    if _VISUAL_AGENT is None:
+        with _VISUAL_AGENT_LOCK:
+            if _VISUAL_AGENT is None:
+                _VISUAL_AGENT = VisualAgent()
+                logger.info("Initialized VisualAgent")
+    return _VISUAL_AGENT
 
 
 # Convenience functions
@@ -623,7 +1266,7 @@ def generate_mood_board(
     Returns:
         Mood board dict with images
     """
-    agent = VisualAgent()
+    agent = get_visual_agent()
     
     strategy = {
         "product": product,
@@ -649,7 +1292,7 @@ if __name__ == "__main__":
         "stylistics": "sustainability and eco-friendly lifestyle"
     }
     
-    agent = VisualAgent()
+    agent = get_visual_agent()
     
     print("\nGenerating mood board...")
     print(f"Product: {test_strategy['product']}")
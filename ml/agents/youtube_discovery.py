@@ -1,24 +1,109 @@
 import os
+import json
+import numpy as np
+import orjson
 import requests
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, List, Dict, Optional
 from dotenv import load_dotenv
-import time
 
-load_dotenv()
+from agents.file_cache import FileCache
+
+try:
+    import yt_dlp
+except ImportError:  # Only needed for DISCOVERY_BACKEND=ytdlp
+    yt_dlp = None
+
+# Skip parsing .env when the deployment already provides the key
+if "YOUTUBE_API_KEY" not in os.environ:
+    load_dotenv()
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
+# "youtube_api" (default) or "ytdlp"; ytdlp searches without spending Data API
+# quota, which is then only used for the cheap channels?id= stats lookup
+DISCOVERY_BACKEND = os.getenv("DISCOVERY_BACKEND", "youtube_api").lower()
+
+# Cache TTLs in seconds: search results change slowly, subscriber counts faster
+SEARCH_CACHE_TTL = 24 * 3600
+STATS_CACHE_TTL = 6 * 3600
+
+# YT_FORCE_REFRESH=1 treats every cache entry as stale (like Cache-Control:
+# no-cache): searches are revalidated via ETag, stats are re-fetched, and the
+# fresh results are written back
+FORCE_REFRESH = os.getenv("YT_FORCE_REFRESH") == "1"
+
+# (divisor, suffix) indexed by thousands-group count of the number
+_FMT_TABLE = [(1, ""), (1000, "K"), (1000000, "M")]
+
+
+@dataclass(slots=True, frozen=True)
+class Influencer:
+    """Standardized influencer record (compact; convert with to_dict() for JSON)"""
+    name: str
+    platform: str
+    niche: str
+    followers: int
+    followers_formatted: str
+    video_count: int
+    view_count: int
+    url: str
+    thumbnail: Optional[str]
+    verification_status: str
+    source: str
+    
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
 
 class YouTubeDiscovery:
     """Discover real YouTube influencers using YouTube Data API v3"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, backend: str = None):
         self.api_key = api_key or YOUTUBE_API_KEY
         if not self.api_key:
             raise ValueError("YouTube API key not found. Set YOUTUBE_API_KEY in .env")
         
+        self.backend = (backend or DISCOVERY_BACKEND).lower()
+        if self.backend == "ytdlp" and yt_dlp is None:
+            raise ValueError("DISCOVERY_BACKEND=ytdlp requires yt-dlp (pip install yt-dlp)")
+        
         self.search_base = "https://www.googleapis.com/youtube/v3/search"
         self.channels_base = "https://www.googleapis.com/youtube/v3/channels"
+        
+        # Reuse connections across calls; retry rate limits (honouring Retry-After)
+        # and transient errors with exponential backoff before surfacing the final
+        # response. 403 quotaExceeded is not retried: it won't clear until reset
+        self.session = requests.Session()
+        retry = Retry(total=5, backoff_factor=1.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=frozenset(["GET"]), respect_retry_after_header=True,
+                      raise_on_status=False)
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry))
+        
+        # Disk cache so repeated discovery runs don't burn API quota; stale
+        # searches are kept a week so they can be revalidated with their ETag
+        self.cache = FileCache("youtube", ttl=SEARCH_CACHE_TTL, retention=7 * 24 * 3600, max_entries=5000)
+    
+    def _log_retries(self, response):
+        """Report adapter-level retries so quota pressure shows up in the logs"""
+        history = getattr(getattr(response.raw, "retries", None), "history", None)
+        if history:
+            statuses = ", ".join(str(attempt.status) for attempt in history)
+            print(f"   ↻ Retried {len(history)}x ({statuses})")
+    
+    def _cache_get(self, key: tuple, ttl: int) -> tuple:
+        """(entry {etag, data} or None, whether it is still fresh) for key"""
+        hit = self.cache.get(json.dumps(key, sort_keys=True), max_age=self.cache.retention)
+        if hit is None:
+            return None, False
+        entry, age = hit
+        return entry, age < ttl and not FORCE_REFRESH
+    
+    def _cache_set(self, key: tuple, data: Any, etag: Optional[str] = None):
+        self.cache.set(json.dumps(key, sort_keys=True), {"etag": etag, "data": data})
     
     def search_channels(self, query: str, region: str = "IN", max_results: int = 10) -> List[Dict]:
         """
@@ -30,7 +115,7 @@ class YouTubeDiscovery:
             max_results: Number of results to return (max 50)
         
         Returns:
-            List of channel data with IDs and basic info
+            List of search items carrying only the channel ID (id.channelId)
         """
         params = {
             "part": "snippet",
@@ -38,26 +123,77 @@ class YouTubeDiscovery:
             "type": "channel",
             "regionCode": region,
             "maxResults": min(max_results, 50),
+            # Only the IDs are used; stats and snippet come from the channels endpoint
+            "fields": "etag,items(id/channelId)",
             "key": self.api_key
         }
         
+        key = ("search", query, region, params["maxResults"])
+        cached, fresh = self._cache_get(key, SEARCH_CACHE_TTL)
+        if fresh:
+            print(f"🔍 Cached YouTube search: '{query}' in {region}")
+            return cached["data"]
+        
+        # Revalidate a stale entry with its ETag; a 304 has no body to download
+        headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+        
         try:
             print(f"🔍 Searching YouTube: '{query}' in {region}")
-            response = requests.get(self.search_base, params=params, timeout=10)
+            response = self.session.get(self.search_base, params=params, headers=headers, timeout=10)
+            self._log_retries(response)
+            
+            if response.status_code == 304:
+                self._cache_set(key, cached["data"], cached["etag"])
+                print(f"   Not modified ({len(cached['data'])} channels)")
+                return cached["data"]
+            
             response.raise_for_status()
             
-            items = response.json().get("items", [])
+            body = orjson.loads(response.content)
+            items = body.get("items", [])
             print(f"   Found {len(items)} channels")
             
+            self._cache_set(key, items, body.get("etag") or response.headers.get("ETag"))
             return items
             
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 403:
                 raise Exception("YouTube API quota exceeded or invalid API key")
+            if e.response.status_code == 429:
+                raise Exception("YouTube API rate limit persisted after retries")
             raise Exception(f"YouTube API error: {e}")
         except Exception as e:
             raise Exception(f"Search failed: {e}")
     
+    def search_channels_ytdlp(self, query: str, region: str = "IN", max_results: int = 10) -> List[Dict]:
+        """
+        Quota-free alternative to search_channels using yt-dlp's ytsearch extractor
+        
+        Args:
+            query: Search query
+            region: Unused (ytsearch has no region filter); kept for signature parity
+            max_results: Number of videos to scan for channels (max 50)
+        
+        Returns:
+            List of search items in the same shape as search_channels (id.channelId)
+        """
+        options = {"quiet": True, "extract_flat": True, "skip_download": True}
+        
+        try:
+            print(f"🔍 Searching YouTube (yt-dlp): '{query}'")
+            with yt_dlp.YoutubeDL(options) as ydl:
+                info = ydl.extract_info(f"ytsearch{min(max_results, 50)}:{query}", download=False)
+        except Exception as e:
+            raise Exception(f"Search failed: {e}")
+        
+        # Results are videos; collapse them to their distinct channels
+        channel_ids = dict.fromkeys(
+            entry["channel_id"] for entry in info.get("entries") or [] if entry and entry.get("channel_id")
+        )
+        print(f"   Found {len(channel_ids)} channels")
+        
+        return [{"id": {"channelId": channel_id}} for channel_id in channel_ids]
+    
     def get_channel_stats(self, channel_ids: List[str]) -> List[Dict]:
         """
         Fetch detailed statistics for channels (subscribers, views, video count)
@@ -72,19 +208,41 @@ class YouTubeDiscovery:
             return []
         
         # YouTube API allows up to 50 IDs per request
+        channel_ids = channel_ids[:50]
+        
+        # Cache per channel so a partial hit only requests the cold IDs
+        items = []
+        cold_ids = []
+        for channel_id in channel_ids:
+            cached, fresh = self._cache_get(("channel", channel_id), STATS_CACHE_TTL)
+            if fresh:
+                items.append(cached["data"])
+            else:
+                cold_ids.append(channel_id)
+        
+        if not cold_ids:
+            print(f"📊 Stats for {len(channel_ids)} channels served from cache")
+            return items
+        
         params = {
             "part": "statistics,snippet",
-            "id": ",".join(channel_ids[:50]),
+            "id": ",".join(cold_ids),
+            "fields": "items(id,snippet(title,description,thumbnails/default),"
+                      "statistics(subscriberCount,videoCount,viewCount,hiddenSubscriberCount))",
             "key": self.api_key
         }
         
         try:
-            print(f"📊 Fetching stats for {len(channel_ids)} channels...")
-            response = requests.get(self.channels_base, params=params, timeout=10)
+            print(f"📊 Fetching stats for {len(cold_ids)} channels ({len(items)} cached)...")
+            response = self.session.get(self.channels_base, params=params, timeout=10)
+            self._log_retries(response)
             response.raise_for_status()
             
-            items = response.json().get("items", [])
-            return items
+            fetched = orjson.loads(response.content).get("items", [])
+            for channel in fetched:
+                self._cache_set(("channel", channel.get("id")), channel)
+            
+            return items + fetched
             
         except Exception as e:
             raise Exception(f"Stats fetch failed: {e}")
@@ -101,25 +259,28 @@ class YouTubeDiscovery:
         Returns:
             Filtered list of channels
         """
-        filtered = []
+        # Look up each channel's statistics once; a shared {} stands in for missing ones
+        empty = {}
+        stats = [c.get("statistics") or empty for c in channels]
         
-        for channel in channels:
+        def sub_count(s):
             try:
-                # Some channels hide subscriber count
-                if channel.get("statistics", {}).get("hiddenSubscriberCount"):
-                    continue
-                
-                sub_count = int(channel.get("statistics", {}).get("subscriberCount", 0))
-                
-                if min_subs <= sub_count <= max_subs:
-                    filtered.append(channel)
-            except (ValueError, KeyError):
-                continue
+                return int(s.get("subscriberCount", 0) or 0)
+            except (ValueError, TypeError):
+                return -1  # Unparseable counts are dropped below
+        
+        n = len(channels)
+        counts = np.fromiter(map(sub_count, stats), dtype=np.int64, count=n)
+        # Some channels hide subscriber count
+        hidden = np.fromiter((bool(s.get("hiddenSubscriberCount")) for s in stats), dtype=bool, count=n)
+        
+        mask = ~hidden & (counts >= 0) & (counts >= min_subs) & (counts <= max_subs)
+        filtered = [channels[i] for i in np.flatnonzero(mask)]
         
         print(f"   ✅ {len(filtered)} channels in range {min_subs:,}-{max_subs:,} subscribers")
         return filtered
     
-    def format_influencer_data(self, channels: List[Dict]) -> List[Dict]:
+    def format_influencer_data(self, channels: List[Dict]) -> List[Influencer]:
         """
         Convert YouTube channel data to standardized influencer format
         
@@ -127,7 +288,7 @@ class YouTubeDiscovery:
             channels: List of channel data from YouTube API
         
         Returns:
-            List of influencer dictionaries
+            List of Influencer records
         """
         influencers = []
         
@@ -137,19 +298,21 @@ class YouTubeDiscovery:
                 stats = channel.get("statistics", {})
                 channel_id = channel.get("id", "")
                 
-                influencer = {
-                    "name": snippet.get("title", "Unknown"),
-                    "platform": "YouTube",
-                    "niche": snippet.get("description", "")[:100],  # First 100 chars
-                    "followers": int(stats.get("subscriberCount", 0)),
-                    "followers_formatted": self._format_number(int(stats.get("subscriberCount", 0))),
-                    "video_count": int(stats.get("videoCount", 0)),
-                    "view_count": int(stats.get("viewCount", 0)),
-                    "url": f"https://youtube.com/channel/{channel_id}",
-                    "thumbnail": snippet.get("thumbnails", {}).get("default", {}).get("url"),
-                    "verification_status": "youtube_verified",
-                    "source": "youtube_api_v3"
-                }
+                followers = int(stats.get("subscriberCount", 0))
+                
+                influencer = Influencer(
+                    name=snippet.get("title", "Unknown"),
+                    platform="YouTube",
+                    niche=snippet.get("description", "")[:100],  # First 100 chars
+                    followers=followers,
+                    followers_formatted=self._format_number(followers),
+                    video_count=int(stats.get("videoCount", 0)),
+                    view_count=int(stats.get("viewCount", 0)),
+                    url=f"https://youtube.com/channel/{channel_id}",
+                    thumbnail=snippet.get("thumbnails", {}).get("default", {}).get("url"),
+                    verification_status="youtube_verified",
+                    source="youtube_api_v3"
+                )
                 
                 influencers.append(influencer)
                 
@@ -193,32 +356,42 @@ class YouTubeDiscovery:
         
         # Build search queries
         queries = self._build_search_queries(domain, audience, country)
+        search = self.search_channels_ytdlp if self.backend == "ytdlp" else self.search_channels
         
         all_channel_ids = set()
+        stats_batches = []
         
-        # Search across multiple queries
-        for query in queries[:3]:  # Limit to 3 queries to save quota
-            try:
-                results = self.search_channels(query, region=country, max_results=10)
-                
-                # Extract channel IDs
-                for item in results:
-                    channel_id = item.get("id", {}).get("channelId")
-                    if channel_id:
-                        all_channel_ids.add(channel_id)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # Each search costs 100 quota units, so only run the fallback query
+            # when the primary one doesn't leave enough candidates to filter
+            for query in queries:
+                try:
+                    results = search(query, region=country, max_results=25)
+                    
+                    # Extract channel IDs not seen in an earlier query
+                    new_ids = []
+                    for item in results:
+                        channel_id = item.get("id", {}).get("channelId")
+                        if channel_id and channel_id not in all_channel_ids:
+                            all_channel_ids.add(channel_id)
+                            new_ids.append(channel_id)
+                    
+                except Exception as e:
+                    print(f"⚠️  Query failed: {e}")
+                    continue
                 
-                time.sleep(0.5)  # Rate limiting
+                # Fetch detailed stats in the background, overlapping the next search
+                if new_ids:
+                    stats_batches.append(pool.submit(self.get_channel_stats, new_ids))
                 
-            except Exception as e:
-                print(f"⚠️  Query failed: {e}")
-                continue
-        
-        if not all_channel_ids:
-            print("❌ No channels found")
-            return []
-        
-        # Fetch detailed stats
-        channels = self.get_channel_stats(list(all_channel_ids))
+                if len(all_channel_ids) >= max_results * 2:
+                    break
+            
+            if not all_channel_ids:
+                print("❌ No channels found")
+                return []
+            
+            channels = [channel for batch in stats_batches for channel in batch.result()]
         
         # Filter by subscriber range
         filtered_channels = self.filter_by_subscriber_range(
@@ -230,38 +403,25 @@ class YouTubeDiscovery:
         # Format as influencer data
         influencers = self.format_influencer_data(filtered_channels)
         
-        # Limit to max_results
-        influencers = influencers[:max_results]
+        # Limit to max_results, converting to plain dicts for callers / JSON
+        influencers = [inf.to_dict() for inf in influencers[:max_results]]
         
         print(f"\n✅ Discovery complete: {len(influencers)} influencers found\n")
         
         return influencers
     
     def _build_search_queries(self, domain: str, audience: str, country: str) -> List[str]:
-        """Build multiple search queries from domain and audience"""
-        queries = []
-        
+        """Build a primary search query and a broader fallback"""
         country_name = {"IN": "India", "US": "USA", "GB": "UK"}.get(country, country)
         
         if audience:
-            queries.append(f"{domain} {audience} {country_name}")
-            queries.append(f"{audience} {domain}")
-            queries.append(f"{domain} tips {country_name}")
-        else:
-            queries.append(f"{domain} {country_name}")
-            queries.append(f"{domain} creators")
-            queries.append(f"{domain} influencers")
-        
-        return queries
+            return [f"{domain} {audience} {country_name}", f"{domain} creators"]
+        return [f"{domain} {country_name}", f"{domain} creators"]
     
     def _format_number(self, num: int) -> str:
         """Format number with K/M suffix"""
-        if num >= 1000000:
-            return f"{num/1000000:.1f}M"
-        elif num >= 1000:
-            return f"{num/1000:.1f}K"
-        else:
-            return str(num)
+        divisor, suffix = _FMT_TABLE[min((len(str(num)) - 1) // 3, 2)] if num > 0 else _FMT_TABLE[0]
+        return f"{num/divisor:.1f}{suffix}" if suffix else str(num)
 
 
 def discover_youtube_influencers(
@@ -299,8 +459,6 @@ def discover_youtube_influencers(
 
 if __name__ == "__main__":
     # Test the discovery
-    import json
-    
     influencers = discover_youtube_influencers(
         domain="sustainable fashion",
         audience="college students",
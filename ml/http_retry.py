@@ -0,0 +1,37 @@
+"""
+Retry-with-backoff helper shared by the orchestrator test scripts
+"""
+
+import time
+
+import requests
+
+
+def _retry_delay(response, attempt: int) -> float:
+    """Seconds to wait before the next attempt: Retry-After if given, else exponential."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(int(retry_after), 30)
+    return min(2 ** attempt, 30)
+
+
+def request_with_backoff(
+    session: requests.Session, method: str, url: str, attempts: int = 6, **kwargs
+) -> requests.Response:
+    """
+    Send a request on session, retrying while the server is unreachable,
+    times out or answers 503 (e.g. still starting up). The last
+    error/response is returned or raised once attempts run out.
+    """
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if last_attempt:
+                raise
+            time.sleep(_retry_delay(None, attempt))
+            continue
+        if response.status_code != 503 or last_attempt:
+            return response
+        time.sleep(_retry_delay(response, attempt))
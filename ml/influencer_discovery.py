@@ -5,14 +5,37 @@ Uses AI to suggest relevant influencers based on campaign strategy
 
 import os
 import json
-from mistralai import Mistral
+import threading
+import orjson
 from dotenv import load_dotenv
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
 
-load_dotenv()
+if TYPE_CHECKING:
+    from mistralai import Mistral
+
+# Skip parsing .env when the deployment already provides the key
+if "MISTRAL_API_KEY" not in os.environ:
+    load_dotenv()
 
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
 
+# One client (and connection pool) for the whole process, created on first use
+_CLIENT: Optional["Mistral"] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_client() -> "Mistral":
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                if not MISTRAL_API_KEY:
+                    raise ValueError("MISTRAL_API_KEY not found in environment")
+                # Imported here so importing this module (e.g. from server.py) stays cheap
+                from mistralai import Mistral
+                _CLIENT = Mistral(api_key=MISTRAL_API_KEY)
+    return _CLIENT
+
 # System prompt for influencer discovery
 SYSTEM_PROMPT = """You are an expert influencer marketing strategist with deep knowledge of social media creators across platforms.
 
@@ -35,6 +58,28 @@ For each influencer, provide:
 
 Return ONLY valid JSON - no additional text or explanation."""
 
+OUTREACH_SYSTEM_PROMPT = "You are an expert at writing authentic, personalized influencer outreach messages that get responses."
+
+OUTREACH_REQUIREMENTS = """Requirements:
+- Keep it under 150 words
+- Start with genuine appreciation for their content
+- Briefly explain why they're a perfect fit
+- Mention the collaboration opportunity
+- Include a clear call-to-action
+- Use {brand_tone} tone
+- Make it feel personal, not templated"""
+
+
+def _loads(content: str) -> Any:
+    """Parse JSON from an LLM reply, stripping markdown code fences if present"""
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+    
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return orjson.loads(content)
+
 
 def discover_influencers(strategy: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -50,10 +95,7 @@ def discover_influencers(strategy: Dict[str, Any]) -> Dict[str, Any]:
         - disclaimer: Transparency message
     """
     
-    if not MISTRAL_API_KEY:
-        raise ValueError("MISTRAL_API_KEY not found in environment")
-    
-    client = Mistral(api_key=MISTRAL_API_KEY)
+    client = _get_client()
     
     # Extract relevant info from strategy
     product = strategy.get('product', 'product')
@@ -104,15 +146,8 @@ Provide ONLY the JSON array, no other text."""
         
         content = response.choices[0].message.content.strip()
         
-        # Extract JSON from response
-        # Remove markdown code blocks if present
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-        
-        # Parse JSON
-        influencers = json.loads(content)
+        # Extract and parse JSON from response
+        influencers = _loads(content)
         
         # Validate structure
         if not isinstance(influencers, list):
@@ -154,10 +189,7 @@ def generate_outreach_message(influencer: Dict[str, Any], campaign_details: Dict
         Personalized outreach message
     """
     
-    if not MISTRAL_API_KEY:
-        raise ValueError("MISTRAL_API_KEY not found in environment")
-    
-    client = Mistral(api_key=MISTRAL_API_KEY)
+    client = _get_client()
     
     product = campaign_details.get('product', 'our product')
     brand_tone = campaign_details.get('tone', 'friendly and professional')
@@ -173,14 +205,7 @@ Campaign:
 Product: {product}
 Brand Tone: {brand_tone}
 
-Requirements:
-- Keep it under 150 words
-- Start with genuine appreciation for their content
-- Briefly explain why they're a perfect fit
-- Mention the collaboration opportunity
-- Include a clear call-to-action
-- Use {brand_tone} tone
-- Make it feel personal, not templated
+{OUTREACH_REQUIREMENTS.format(brand_tone=brand_tone)}
 
 Write ONLY the message, no subject line or additional notes."""
 
@@ -188,7 +213,7 @@ Write ONLY the message, no subject line or additional notes."""
         response = client.chat.complete(
             model="mistral-large-latest",
             messages=[
-                {"role": "system", "content": "You are an expert at writing authentic, personalized influencer outreach messages that get responses."},
+                {"role": "system", "content": OUTREACH_SYSTEM_PROMPT},
                 {"role": "user", "content": outreach_prompt}
             ],
             temperature=0.8,
@@ -1,16 +1,51 @@
 import os
+import hashlib
 import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html as lxml_html
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 import json
 import re
-import time
 
-load_dotenv()
+# Skip parsing .env when the deployment already provides the key
+if "SCRAPINGBEE_API_KEY" not in os.environ:
+    load_dotenv()
 
 SCRAPINGBEE_API_KEY = os.getenv("SCRAPINGBEE_API_KEY")
 
+# Compiled once; lxml evaluates these in C instead of walking the tree in Python
+_REGEX_NS = {'re': 'http://exslt.org/regular-expressions'}
+_SOCIAL_BLADE_ROWS = etree.XPath(
+    './/div[contains(@style, "padding")]'
+)
+_IMH_ITEMS = etree.XPath(
+    '//*[self::article or self::div or self::li][re:test(@class, "influencer|creator|profile", "i")]',
+    namespaces=_REGEX_NS
+)
+_IMH_NAME = etree.XPath(
+    '(.//*[self::h2 or self::h3 or self::h4 or self::a][re:test(@class, "name|title|heading", "i")])[1]',
+    namespaces=_REGEX_NS
+)
+
+
+# The suffix must end a word, so "100 members" is 100, not 100M
+_NUM_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([KMB]?)\b', re.I)
+_MULTIPLIERS = {'': 1, 'K': 1000, 'M': 1000000, 'B': 1000000000}
+
+
+def _name_hash(name: str) -> int:
+    """64-bit hash of a normalized name, cheaper to keep in a set than the string"""
+    digest = hashlib.blake2b(name.lower().strip().encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _text(element) -> str:
+    """Concatenate stripped text fragments (same as BeautifulSoup get_text(strip=True))"""
+    return ''.join(part.strip() for part in element.itertext())
+
 
 class InfluencerScraper:
     """Scrape influencer data from public directory sites using ScrapingBee API"""
@@ -21,10 +56,16 @@ class InfluencerScraper:
             raise ValueError("ScrapingBee API key not found. Set SCRAPINGBEE_API_KEY in .env")
         
         self.base_url = "https://app.scrapingbee.com/api/v1/"
+        
+        # Reuse connections across calls; retry transient errors and honour
+        # Retry-After on 429s before surfacing the final response
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                      respect_retry_after_header=True, raise_on_status=False)
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry))
     
-    def _scrape_with_bee(self, url: str, render_js: bool = True, wait: int = 5000) -> str:
-        """Make request using ScrapingBee API"""
-        params = {
+    def _bee_params(self, url: str, render_js: bool, wait: int) -> Dict[str, str]:
+        return {
             'api_key': self.api_key,
             'url': url,
             'render_js': 'true' if render_js else 'false',
@@ -32,13 +73,25 @@ class InfluencerScraper:
             'country_code': 'us',
             'wait': str(wait)  # Wait for JS to render
         }
+    
+    def _scrape_tree_with_bee(self, url: str, render_js: bool = True, wait: int = 5000):
+        """
+        Fetch a page via ScrapingBee and parse it while it downloads
         
-        response = requests.get(self.base_url, params=params)
+        Chunks are fed straight into lxml, so the (up to several MB) page is never
+        held as one decoded str alongside its tree.
+        """
+        params = self._bee_params(url, render_js, wait)
         
-        if response.status_code == 200:
-            return response.text
-        else:
-            raise Exception(f"ScrapingBee error: {response.status_code} - {response.text}")
+        with self.session.get(self.base_url, params=params, stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"ScrapingBee error: {response.status_code} - {response.text}")
+            
+            # Same encoding response.text would use
+            parser = lxml_html.HTMLParser(encoding=response.encoding)
+            for chunk in response.iter_content(chunk_size=65536):
+                parser.feed(chunk)
+            return parser.close()
     
     def scrape_social_blade(self, platform: str = "instagram", limit: int = 50) -> List[Dict]:
         """
@@ -50,24 +103,23 @@ class InfluencerScraper:
         
         try:
             print(f"Scraping Social Blade ({platform})...")
-            html = self._scrape_with_bee(url, render_js=False)  # Social Blade doesn't need JS rendering
-            soup = BeautifulSoup(html, 'html.parser')
+            tree = self._scrape_tree_with_bee(url, render_js=False)  # Social Blade doesn't need JS rendering
             
             influencers = []
             
             # Social Blade uses a table with id="socialblade-user-content"
-            table = soup.find('div', {'id': 'socialblade-user-content'})
+            table = tree.get_element_by_id('socialblade-user-content', None)
             
-            if table:
+            if table is not None:
                 # Find all ranking divs
-                rank_divs = table.find_all('div', style=re.compile('padding'))
+                rank_divs = _SOCIAL_BLADE_ROWS(table)
                 
                 for div in rank_divs[:limit]:
                     try:
                         # Extract username
-                        link = div.find('a')
-                        if link:
-                            username = link.get_text(strip=True)
+                        link = div.find('.//a')
+                        if link is not None:
+                            username = _text(link)
                             
                             influencer = {
                                 'name': username,
@@ -76,7 +128,7 @@ class InfluencerScraper:
                                 'engagement': None,
                                 'category': 'general',
                                 'source': 'socialblade',
-                                'url': f"https://socialblade.com{link['href']}" if link.get('href') else None
+                                'url': f"https://socialblade.com{link.get('href')}" if link.get('href') else None
                             }
                             influencers.append(influencer)
                     except Exception as e:
@@ -108,21 +160,20 @@ class InfluencerScraper:
         
         try:
             print(f"Scraping Influencer Marketing Hub ({platform})...")
-            html = self._scrape_with_bee(url, render_js=True, wait=5000)
-            soup = BeautifulSoup(html, 'html.parser')
+            tree = self._scrape_tree_with_bee(url, render_js=True, wait=5000)
             
             influencers = []
             
             # Look for article or list items
-            items = soup.find_all(['article', 'div', 'li'], class_=re.compile(r'influencer|creator|profile', re.I))
+            items = _IMH_ITEMS(tree)
             
             for item in items[:limit]:
                 try:
-                    name_elem = item.find(['h2', 'h3', 'h4', 'a'], class_=re.compile(r'name|title|heading', re.I))
+                    name_elem = _IMH_NAME(item)
                     
                     if name_elem:
                         influencer = {
-                            'name': name_elem.get_text(strip=True),
+                            'name': _text(name_elem[0]),
                             'platform': platform,
                             'followers': None,
                             'engagement': None,
@@ -148,52 +199,45 @@ class InfluencerScraper:
         """
         all_influencers = []
         
-        # Try Social Blade (simplest, most reliable)
-        try:
-            print("\n📊 Source 1/2: Social Blade")
-            social_blade_data = self.scrape_social_blade(platform, limit)
-            all_influencers.extend(social_blade_data)
-            time.sleep(2)
-        except Exception as e:
-            print(f"❌ Social Blade failed: {e}")
+        # Social Blade (simplest, most reliable) and Influencer Marketing Hub.
+        # Both go through ScrapingBee, so there's no need to throttle between them
+        sources = [
+            ("Social Blade", self.scrape_social_blade),
+            ("Influencer Marketing Hub", self.scrape_influencer_marketing_hub),
+        ]
         
-        # Try Influencer Marketing Hub
-        try:
-            print("\n📊 Source 2/2: Influencer Marketing Hub")
-            imh_data = self.scrape_influencer_marketing_hub(platform, limit)
-            all_influencers.extend(imh_data)
-            time.sleep(2)
-        except Exception as e:
-            print(f"❌ Influencer Marketing Hub failed: {e}")
+        print(f"\n📊 Scraping {len(sources)} sources concurrently")
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            futures = [(name, pool.submit(scrape, platform, limit)) for name, scrape in sources]
+            
+            for name, future in futures:
+                try:
+                    all_influencers.extend(future.result())
+                except Exception as e:
+                    print(f"❌ {name} failed: {e}")
         
         # Remove duplicates based on name
         unique_influencers = []
-        seen_names = set()
+        seen_hashes = set()
         
         for inf in all_influencers:
-            name_lower = inf['name'].lower()
-            if name_lower not in seen_names:
+            h = _name_hash(inf['name'])
+            if h not in seen_hashes:
                 unique_influencers.append(inf)
-                seen_names.add(name_lower)
+                seen_hashes.add(h)
         
         print(f"\n✅ Total unique influencers: {len(unique_influencers)}")
         return unique_influencers
     
     def _parse_number(self, text: str) -> Optional[int]:
         """Parse follower count from text (handles K, M, B suffixes)"""
+        match = _NUM_RE.search(text or '')
+        if not match:
+            return None
+        number, suffix = match.group(1, 2)
         try:
-            text = text.strip().upper().replace(',', '')
-            
-            if 'K' in text:
-                return int(float(text.replace('K', '')) * 1000)
-            elif 'M' in text:
-                return int(float(text.replace('M', '')) * 1000000)
-            elif 'B' in text:
-                return int(float(text.replace('B', '')) * 1000000000)
-            else:
-                # Extract just the digits
-                return int(''.join(filter(str.isdigit, text)))
-        except:
+            return int(float(number.replace(',', '')) * _MULTIPLIERS[suffix.upper()])
+        except ValueError:
             return None
 
 
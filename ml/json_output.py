@@ -0,0 +1,24 @@
+"""
+JSON output helper shared by the test scripts
+"""
+
+import orjson
+
+
+def save_json(obj, path, skip_unchanged=False):
+    """
+    Write obj to path as indented UTF-8 JSON. With skip_unchanged, the file
+    is left alone when it already holds exactly these bytes. Returns whether
+    the file was written.
+    """
+    blob = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    if skip_unchanged:
+        try:
+            with open(path, "rb") as f:
+                if f.read() == blob:
+                    return False
+        except OSError:
+            pass
+    with open(path, "wb") as f:
+        f.write(blob)
+    return True
@@ -1,11 +1,21 @@
 import os
-import json
+import asyncio
+import orjson
 import re
+import threading
+import time
 import requests
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 import logging
 
+from agents.file_cache import FileCache
+
 load_dotenv()
 
 # Configure logging
@@ -18,7 +28,129 @@ GOOGLE_CX = os.getenv("GOOGLE_CX")  # Google Custom Search Engine ID
 SERPAPI_KEY = os.getenv("SERPAPI_KEY")  # Optional SerpAPI key (fallback)
 
 
-def search_google(query: str, num: int = 5, country: Optional[str] = None, recent_days: Optional[int] = None) -> List[Dict[str, str]]:
+# Shared connection pool for Google CSE / SerpAPI; transient errors are retried
+# and the final response is left for raise_for_status (keeps the 403 guidance)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3, backoff_jitter=0.1,
+                      status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+))
+
+class _TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Allows bursts of up to `max_rate` calls, refilling at
+    `max_rate / time_period` tokens per second.
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = max_rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._last) * self.max_rate / self.time_period
+                self._tokens = min(self.max_rate, self._tokens + refill)
+                self._last = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) * self.time_period / self.max_rate
+            time.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+# Per-provider outbound limits (~5 req/s) so bursts from concurrent callers stay
+# under the QPS ceiling instead of cascading into 429s and fallbacks
+_GOOGLE_LIMITER = _TokenBucket(max_rate=5, time_period=1.0)
+_SERPAPI_LIMITER = _TokenBucket(max_rate=5, time_period=1.0)
+
+# Google statuses that the SerpAPI fallback can actually help with: bad/restricted
+# key, or throttling that outlasted the adapter's retries. Anything else (5xx,
+# network errors) is transient and already retried, so falling back would only
+# double the latency
+_FALLBACK_STATUSES = {401, 403, 429}
+
+# In-process LRU + TTL cache of search results; every CSE call is billed
+SEARCH_CACHE_TTL = 3600  # seconds
+SEARCH_CACHE_MAXSIZE = 1024
+_search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+
+def _search_cache_key(query: str, num: int, country: Optional[str], recent_days: Optional[int]) -> tuple:
+    return (" ".join(query.lower().split()), min(num, 10), (country or "").lower(), int(recent_days or 0))
+
+
+def _search_cache_get(key: tuple) -> Optional[List["SearchResult"]]:
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if expires_at <= time.monotonic():
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return list(results)
+
+
+def _search_cache_set(key: tuple, results: List["SearchResult"]) -> None:
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic() + SEARCH_CACHE_TTL, list(results))
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_CACHE_MAXSIZE:
+            _search_cache.popitem(last=False)
+
+
+# Disk cache of whole find_influencers results, so restarts/dev reloads replay
+# recent analyses without any API calls
+MARKET_CACHE_TTL = 3600  # seconds
+_MARKET_CACHE = FileCache("market", ttl=MARKET_CACHE_TTL, max_entries=500)
+
+
+def clear_search_cache() -> None:
+    """Drop all cached search results."""
+    with _search_cache_lock:
+        _search_cache.clear()
+
+
+@dataclass(slots=True, frozen=True)
+class SearchResult:
+    """Compact, immutable search hit (safe to share across search-cache hits)"""
+    title: str
+    link: str
+    snippet: str
+    is_profile: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def _search_result(title: str, link: str, snippet: str) -> SearchResult:
+    """Normalized search result; profile detection runs once here, at ingestion,
+    so cached results never need re-classifying."""
+    return SearchResult(title, link, snippet, _is_profile_link(link))
+
+
+def search_google(query: str, num: int = 5, country: Optional[str] = None, recent_days: Optional[int] = None) -> List[SearchResult]:
     """
     Search Google using Custom Search API.
 
@@ -29,18 +161,26 @@ def search_google(query: str, num: int = 5, country: Optional[str] = None, recen
         recent_days: Optional, limit results to the last N days
 
     Returns:
-        List of search results with title, link, and snippet
+        List of SearchResult (title, link, snippet, is_profile)
     """
     if not GOOGLE_API_KEY or not GOOGLE_CX:
         logger.error("Missing GOOGLE_API_KEY or GOOGLE_CX environment variables")
         raise ValueError("Missing GOOGLE_API_KEY or GOOGLE_CX")
 
+    cache_key = _search_cache_key(query, num, country, recent_days)
+    cached = _search_cache_get(cache_key)
+    if cached is not None:
+        logger.info(f"Search cache hit ({len(cached)} results) for: {query}")
+        return cached
+
     url = "https://www.googleapis.com/customsearch/v1"
     params = {
         "key": GOOGLE_API_KEY,
         "cx": GOOGLE_CX,
         "q": query,
-        "num": min(num, 10)  # API limit is 10 per request
+        "num": min(num, 10),  # API limit is 10 per request
+        # Skip pagemap/queries/searchInformation/etc.; only these fields are used
+        "fields": "items(title,link,snippet)"
     }
 
     # Optional country and date restrictions
@@ -51,30 +191,28 @@ def search_google(query: str, num: int = 5, country: Optional[str] = None, recen
         params["dateRestrict"] = f"d{int(recent_days)}"
 
     try:
-        response = requests.get(url, params=params, timeout=15)
+        with _GOOGLE_LIMITER:
+            response = _SESSION.get(url, params=params, timeout=15)
         response.raise_for_status()
 
-        data = response.json()
-        items = data.get("items", [])
-
-        results = []
-        for item in items:
-            results.append({
-                "title": item.get("title", ""),
-                "link": item.get("link", ""),
-                "snippet": item.get("snippet", "")
-            })
+        # Parse the raw bytes and keep only the fields we use (CSE items also
+        # carry pagemap/htmlSnippet/etc.)
+        data = orjson.loads(response.content)
+        results = [_search_result(item.get("title", ""), item.get("link", ""), item.get("snippet", ""))
+                   for item in data.get("items", [])]
 
         logger.info(f"Google Search returned {len(results)} results for: {query}")
+        _search_cache_set(cache_key, results)
         return results
 
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
+        # ValueError: a malformed JSON body (orjson.JSONDecodeError)
         # Provide clearer guidance for 403 errors and optionally fall back
         logger.error(f"Google Search API error: {e}")
         resp = getattr(e, 'response', None)
         if resp is not None:
             try:
-                logger.error(f"Response: {resp.text}")
+                logger.error(f"Response: {resp.content[:200].decode('utf-8', errors='replace')}")
                 data = resp.json()
                 # If it's a 403, include actionable advice
                 if resp.status_code == 403:
@@ -87,19 +225,25 @@ def search_google(query: str, num: int = 5, country: Optional[str] = None, recen
                 # ignore json parsing errors
                 pass
 
+        status = resp.status_code if resp is not None else None
+        if status not in _FALLBACK_STATUSES:
+            logger.warning(f"Google Search failed with {status or 'no response'} after retries; not falling back")
+            return []
+
         # Try optional SerpAPI fallback if configured
-        SERPAPI_KEY = os.getenv("SERPAPI_KEY")
         if SERPAPI_KEY:
-            logger.info("Attempting fallback to SerpAPI since SERPAPI_KEY is present")
+            logger.info(f"Google Search returned {status}; attempting fallback to SerpAPI since SERPAPI_KEY is present")
             try:
-                return serpapi_search(query, num=num, country=country, recent_days=recent_days)
+                results = serpapi_search(query, num=num, country=country, recent_days=recent_days)
+                _search_cache_set(cache_key, results)
+                return results
             except Exception as se:
                 logger.error(f"SerpAPI fallback failed: {se}")
 
         return []
 
 
-def serpapi_search(query: str, num: int = 5, country: Optional[str] = None, recent_days: Optional[int] = None) -> List[Dict[str, str]]:
+def serpapi_search(query: str, num: int = 5, country: Optional[str] = None, recent_days: Optional[int] = None) -> List[SearchResult]:
     """
     Fallback search using SerpAPI (if SERPAPI_KEY provided).
     Docs: https://serpapi.com/
@@ -123,17 +267,12 @@ def serpapi_search(query: str, num: int = 5, country: Optional[str] = None, rece
         params["tbs"] = f"qdr:d{int(recent_days)}"
 
     try:
-        r = requests.get(url, params=params, timeout=15)
+        with _SERPAPI_LIMITER:
+            r = _SESSION.get(url, params=params, timeout=15)
         r.raise_for_status()
-        data = r.json()
-        items = data.get("organic_results", [])
-        results = []
-        for item in items:
-            results.append({
-                "title": item.get("title", ""),
-                "link": item.get("link", ""),
-                "snippet": item.get("snippet", "") or item.get("snippet", "")
-            })
+        data = orjson.loads(r.content)
+        results = [_search_result(item.get("title", ""), item.get("link", ""), item.get("snippet", ""))
+                   for item in data.get("organic_results", [])]
         logger.info(f"SerpAPI returned {len(results)} results for: {query}")
         return results
     except requests.exceptions.RequestException as e:
@@ -141,21 +280,31 @@ def serpapi_search(query: str, num: int = 5, country: Optional[str] = None, rece
         raise
 
 
+# Profile URL pattern per host, most common influencer platforms first. A link
+# is only tested against its own host's pattern, so each check is a single match
+_PROFILE_PATTERNS = {host: re.compile(p) for host, p in [
+    ("instagram.com", r'^https?://(www\.)?instagram\.com/[@A-Za-z0-9_.-]+/?$'),
+    ("youtube.com", r'^https?://(www\.)?youtube\.com/(?:channel/|c/|user/|@)[A-Za-z0-9_\-@]+(?:/.*)?$'),
+    ("tiktok.com", r'^https?://(www\.)?tiktok\.com/@[\w\.-]+/?'),
+    ("twitter.com", r'^https?://(www\.)?twitter\.com/[@A-Za-z0-9_\.-]+/?$'),
+    ("linkedin.com", r'^https?://(www\.)?linkedin\.com/in/[A-Za-z0-9-_%]+/?$'),
+]}
+
+
+_PLATFORMS = ("instagram", "youtube", "tiktok", "blog", "twitter")
+_PLATFORM_RE = re.compile("|".join(_PLATFORMS), re.I)
+
+
 def _is_profile_link(link: str) -> bool:
     """Detect whether a link is likely a social profile/handle page."""
-    if not link:
+    if not link or not link.startswith(("http://", "https://")):
         return False
-    patterns = [
-        r'^https?://(www\.)?instagram\.com/[@A-Za-z0-9_.-]+/?$',
-        r'^https?://(www\.)?tiktok\.com/@[\w\.-]+/?',
-        r'^https?://(www\.)?twitter\.com/[@A-Za-z0-9_\.-]+/?$',
-        r'^https?://(www\.)?linkedin\.com/in/[A-Za-z0-9-_%]+/?$',
-        r'^https?://(www\.)?youtube\.com/(?:channel/|c/|user/|@)[A-Za-z0-9_\-@]+(?:/.*)?$'
-    ]
-    for p in patterns:
-        if re.match(p, link):
-            return True
-    return False
+    parts = link.split("/", 3)
+    if len(parts) < 3:
+        return False
+    host = parts[2]
+    pattern = _PROFILE_PATTERNS.get(host[4:] if host.startswith("www.") else host)
+    return bool(pattern and pattern.match(link))
 
 
 def find_influencers(domain: str, target_audience: str, num_results: int = 5, profiles_only: bool = True, country: Optional[str] = None, recent_days: Optional[int] = None) -> Dict[str, Any]:
@@ -177,16 +326,20 @@ def find_influencers(domain: str, target_audience: str, num_results: int = 5, pr
     """
     logger.info(f"Finding influencers for domain: {domain}, audience: {target_audience}, profiles_only={profiles_only}, country={country}, recent_days={recent_days}")
 
+    cache_key = repr((domain, target_audience, num_results, profiles_only, country, recent_days))
+    cached = _MARKET_CACHE.get(cache_key)
+    if cached is not None:
+        logger.info(f"Market cache hit ({cached[0]['influencers_count']} influencers)")
+        return cached[0]
+
     # Platform-specific site queries (search for profile pages)
     platform_sites = ["instagram.com", "youtube.com", "tiktok.com", "twitter.com", "linkedin.com"]
 
     queries = []
     if profiles_only:
-        for site in platform_sites:
-            queries.append(f"site:{site} {domain} {target_audience} influencer")
-        # Also try common variants
-        queries.append(f"site:instagram.com {domain} {target_audience}")
-        queries.append(f"site:youtube.com {domain} {target_audience} channel")
+        # One compound query covers every platform (CSE bills per request)
+        site_filter = " OR ".join(f"site:{site}" for site in platform_sites)
+        queries.append(f"({site_filter}) {domain} {target_audience} influencer")
     # Fallback/general queries
     queries.extend([
         f"top {domain} influencers for {target_audience}",
@@ -196,44 +349,79 @@ def find_influencers(domain: str, target_audience: str, num_results: int = 5, pr
         f"{target_audience} {domain} thought leaders"
     ])
 
-    all_results = []
+    # Drop queries that only differ by case/whitespace (e.g. empty audience)
+    seen_queries = set()
+    unique_queries = []
+    for query in queries:
+        key = " ".join(query.lower().split())
+        if key not in seen_queries:
+            seen_queries.add(key)
+            unique_queries.append(query)
 
-    # Use up to first 4 queries to limit quota; you can adjust this
-    for query in queries[:4]:
+    def run_query(query: str) -> List[SearchResult]:
         # Prefer SerpAPI fallback if Google is blocked (handled in search_google)
-        results = search_google(query, num=num_results, country=country, recent_days=recent_days)
-        all_results.extend(results)
+        # A request costs the same whatever num is, so always take the max of 10
+        return search_google(query, num=10, country=country, recent_days=recent_days)
 
-    # Deduplicate by link while preserving order
+    # Deduplicate by link (preserving order) and, if profiles_only, put profile
+    # links first - stopping once enough results are collected
     seen_links = set()
-    unique_results = []
-    for result in all_results:
-        link = result.get("link", "")
-        if link and link not in seen_links:
+    profile_links, other_links = [], []
+
+    def collect(results: List[SearchResult]) -> bool:
+        """Add one query's results; True once num_results are in hand."""
+        for result in results:
+            link = result.link
+            if not link or link in seen_links:
+                continue
             seen_links.add(link)
-            unique_results.append(result)
 
-    # If profiles_only, prioritize profile links
+            if profiles_only and result.is_profile:
+                profile_links.append(result)
+                if len(profile_links) >= num_results:
+                    return True
+            else:
+                other_links.append(result)
+                if not profiles_only and len(other_links) >= num_results:
+                    return True
+        return False
+
+    # Limit quota: the compound profile query plus one general fallback, or up to
+    # 4 general queries
+    dispatched = unique_queries[:2 if profiles_only else 4]
     if profiles_only:
-        profile_links = [r for r in unique_results if _is_profile_link(r.get("link", ""))]
-        other_links = [r for r in unique_results if not _is_profile_link(r.get("link", ""))]
-        final_results = profile_links + other_links
+        # Progressive: the fallback is only paid for when the compound query
+        # didn't already yield enough profile links
+        for i, query in enumerate(dispatched):
+            if collect(run_query(query)):
+                dispatched = dispatched[:i + 1]
+                break
     else:
-        final_results = unique_results
+        # Independent general queries, issued concurrently (results keep query order)
+        with ThreadPoolExecutor(max_workers=len(dispatched) or 1) as pool:
+            for results in pool.map(run_query, dispatched):
+                if collect(results):
+                    break
 
-    # Limit to requested number
-    final_results = final_results[:num_results]
+    # Limit to requested number; plain dicts from here on (API/JSON boundary)
+    final_results = [r.to_dict() for r in (profile_links + other_links)[:num_results]]
 
-    return {
+    result = {
         "domain": domain,
         "target_audience": target_audience,
         "influencers_count": len(final_results),
         "influencers": final_results,
-        "search_queries_used": queries[:4],
+        "search_queries_used": dispatched,
         "country": country,
         "recent_days": recent_days
     }
 
+    # Don't pin an empty (likely failed) search for the whole TTL
+    if final_results:
+        _MARKET_CACHE.set(cache_key, result)
+
+    return result
+
 
 def analyze_market(strategy: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -310,6 +498,24 @@ def analyze_market(strategy: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
+async def analyze_market_async(strategy: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async entry point for analyze_market (e.g. from FastAPI handlers).
+
+    The search fan-out blocks on network I/O, so the whole analysis runs in a
+    worker thread and the event loop stays free. Insights and recommendations are
+    microseconds of pure-Python work on the search results, so they run inline
+    there rather than as separate concurrent tasks.
+
+    Args:
+        strategy: Same as analyze_market
+
+    Returns:
+        Same as analyze_market
+    """
+    return await asyncio.to_thread(analyze_market, strategy)
+
+
 def generate_market_insights(strategy: Dict[str, Any], influencer_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Generate insights based on influencer search results.
@@ -323,17 +529,18 @@ def generate_market_insights(strategy: Dict[str, Any], influencer_data: Dict[str
     """
     influencers = influencer_data.get("influencers", [])
     
-    # Analyze influencer types from snippets
-    platform_mentions = {"instagram": 0, "youtube": 0, "tiktok": 0, "blog": 0, "twitter": 0}
+    # Analyze influencer types from snippets: one regex scan per field, each
+    # platform counted at most once per influencer
+    counts = Counter()
     
     for inf in influencers:
-        snippet = inf.get("snippet", "").lower()
-        title = inf.get("title", "").lower()
-        combined = snippet + " " + title
-        
-        for platform in platform_mentions.keys():
-            if platform in combined:
-                platform_mentions[platform] += 1
+        counts.update({
+            m.group(0).lower()
+            for field in (inf.get("snippet", ""), inf.get("title", ""))
+            for m in _PLATFORM_RE.finditer(field)
+        })
+    
+    platform_mentions = {platform: counts[platform] for platform in _PLATFORMS}
     
     # Determine most common platforms
     top_platforms = sorted(platform_mentions.items(), key=lambda x: x[1], reverse=True)[:3]
@@ -406,4 +613,4 @@ if __name__ == "__main__":
     }
     
     result = analyze_market(test_strategy)
-    print(json.dumps(result, indent=2))
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
@@ -1,9 +1,17 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field, validator
-from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, validator
+from typing import Dict, Any, List, Optional, Type, TypeVar
+import asyncio
+from contextlib import asynccontextmanager
 import logging
+import os
+import orjson
+import time
 import re
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 import requests
 from io import BytesIO
 from pypdf import PdfReader
@@ -11,19 +19,105 @@ import spacy
 from textblob import TextBlob
 from functools import lru_cache
 from agents.copywriting import generate_copy
-from agents.strategyParser import StrategyParser
-from agents.visualAgent import VisualAgent
+from agents.strategyParser import get_strategy_parser
+from agents.visualAgent import get_visual_agent
 from agents.mediaAgent import generate_media_plan
 from influencer_discovery import discover_influencers, generate_outreach_message
+from agents.outreach import generate_outreach_for_influencer
+from agents.content_fetchers import fetch_youtube_content
+from agents.content_normalizer import normalize_content_list
+from agents.content_summarizer import summarize_content
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# ---------------- PROVIDER LIMITS ---------------- #
+
+class ProviderLimit:
+    """
+    Per-provider concurrency cap plus requests-per-minute token bucket.
+    Bursts queue here instead of overshooting the quota and degrading into
+    429 retries inside the agents. State is per process: the module-level
+    limits below split the configured quota across WEB_CONCURRENCY workers.
+    """
+    
+    def __init__(self, name: str, rpm: float, concurrency: int):
+        self.name = name
+        self.rpm = rpm
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._tokens = float(rpm)
+        self._last = time.monotonic()
+    
+    async def _take_token(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rpm, self._tokens + (now - self._last) * self.rpm / 60.0)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * 60.0 / self.rpm)
+    
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+    
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking agent call on the threadpool under this limit"""
+        async with self:
+            return await run_in_threadpool(func, *args, **kwargs)
+
+
+# uvicorn worker processes. Rate limits, caches and in-flight coalescing all
+# live per worker, so the quotas below are divided evenly between workers.
+WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+
+def _per_worker_limit(name: str, rpm: float, concurrency: int) -> ProviderLimit:
+    return ProviderLimit(name, rpm=rpm / WORKERS, concurrency=max(1, concurrency // WORKERS))
+
+
+# Sized to the default paid tiers; override per deployment. These are totals
+# for the whole server (not per worker). One token is taken per agent call.
+MAX_CONCURRENT_LLM = int(os.getenv("MAX_CONCURRENT_LLM", "8"))
+MISTRAL_LIMIT = _per_worker_limit("mistral", float(os.getenv("MISTRAL_RPM", "60")), MAX_CONCURRENT_LLM)
+YOUTUBE_LIMIT = _per_worker_limit("youtube", float(os.getenv("YOUTUBE_RPM", "60")), 4)
+# Each mood board already fans out tiles internally under VisualAgent's own Gemini bucket
+GEMINI_LIMIT = _per_worker_limit("gemini", float(os.getenv("GEMINI_RPM", "60")), 2)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Starting Marketing Campaign Orchestrator & Advanced Text Feature Extractor API...")
+    try:
+        get_nlp()
+        get_visual_agent()
+        logger.info("API ready")
+    except Exception as e:
+        logger.error(f"Failed to load models: {e}")
+    warm_up_validators()
+    # Real LLM round-trips cost quota, so only on request (e.g. before load tests)
+    if os.getenv("WARMUP") == "1":
+        await warm_up_agents()
+    yield
+
 app = FastAPI(
     title="Marketing Campaign Orchestrator & Text Feature Extractor",
     description="Orchestrates marketing campaigns and provides advanced text analysis with context-aware feature extraction",
-    version="4.0.0"
+    version="4.0.0",
+    # Serialize response bodies with orjson (C) instead of stdlib json
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # ---------------- LAZY LOADING ---------------- #
@@ -92,11 +186,25 @@ TONE_KEYWORDS = {
 
 # ---------------- MODELS ---------------- #
 
-class CampaignRequest(BaseModel):
+# Response models type agent payloads as bare dict/list: FastAPI still runs
+# the response_model validator on return, and Dict[str, Any] / List[Dict]
+# would walk every key and element of data the agents already produced.
+
+class FrozenModel(BaseModel):
+    """Base for request/response models: immutable, never revalidated"""
+    model_config = ConfigDict(
+        frozen=True,
+        extra="ignore",
+        validate_assignment=False,
+        revalidate_instances="never"
+    )
+
+
+class CampaignRequest(FrozenModel):
     strategy: Dict[str, Any]
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "strategy": {
                     "product": "EcoBottle - Reusable Water Bottle",
@@ -108,39 +216,47 @@ class CampaignRequest(BaseModel):
                 }
             }
         }
+    )
 
-class CampaignResponse(BaseModel):
+class CampaignResponse(FrozenModel):
     status: str
-    strategy: Dict[str, Any]
-    copywriting: Dict[str, Any]
+    strategy: dict
+    copywriting: Optional[dict] = None
+    mood_board: Optional[dict] = None
+    media_plan: Optional[dict] = None
+    influencers: Optional[dict] = None
+    errors: Optional[Dict[str, str]] = None
+    timings: Optional[Dict[str, float]] = None
 
 
-class ParseStrategyRequest(BaseModel):
+class ParseStrategyRequest(FrozenModel):
     input_data: str
     input_type: str = "text"  # "text" or "pdf"
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "input_data": "We are Swasya, a sustainable jeans brand...",
                 "input_type": "text"
             }
         }
+    )
 
 
-class ParseStrategyResponse(BaseModel):
+class ParseStrategyResponse(FrozenModel):
     status: str
-    strategy: Dict[str, Any]
-    metadata: Dict[str, Any]
+    strategy: dict
+    metadata: dict
 
 
-class VisualMoodBoardRequest(BaseModel):
+class VisualMoodBoardRequest(FrozenModel):
     strategy: Dict[str, Any]
     num_variations: int = 4
     image_size: str = "1024x1024"
+    include_base64: bool = True
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "strategy": {
                     "product": "Swasya",
@@ -151,22 +267,24 @@ class VisualMoodBoardRequest(BaseModel):
                 "num_variations": 4
             }
         }
+    )
 
 
-class VisualMoodBoardResponse(BaseModel):
+class VisualMoodBoardResponse(FrozenModel):
     status: str
     product: str
     visual_theme: str
     color_palette: List[str]
-    tiles: List[Dict[str, Any]]
+    tiles: list
     total_generated: int
+    json_file: Optional[str] = None
 
 
-class MediaPlanRequest(BaseModel):
+class MediaPlanRequest(FrozenModel):
     strategy: Dict[str, Any]
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "strategy": {
                     "product": "Swasya",
@@ -175,21 +293,22 @@ class MediaPlanRequest(BaseModel):
                 }
             }
         }
+    )
 
 
-class MediaPlanResponse(BaseModel):
+class MediaPlanResponse(FrozenModel):
     status: str
-    platforms: List[Dict[str, Any]]
-    posting_schedule: Dict[str, Any]
-    content_mix: Dict[str, Any]
-    metadata: Dict[str, Any]
+    platforms: list
+    posting_schedule: dict
+    content_mix: dict
+    metadata: dict
 
 
-class InfluencerDiscoveryRequest(BaseModel):
+class InfluencerDiscoveryRequest(FrozenModel):
     strategy: Dict[str, Any]
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "strategy": {
                     "product": "Swasya",
@@ -200,21 +319,22 @@ class InfluencerDiscoveryRequest(BaseModel):
                 }
             }
         }
+    )
 
 
-class InfluencerDiscoveryResponse(BaseModel):
+class InfluencerDiscoveryResponse(FrozenModel):
     status: str
     count: int
-    influencers: List[Dict[str, Any]]
-    metadata: Dict[str, Any]
+    influencers: list
+    metadata: dict
 
 
-class OutreachRequest(BaseModel):
+class OutreachRequest(FrozenModel):
     influencer: Dict[str, Any]
     campaign_details: Dict[str, Any]
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "influencer": {
                     "name": "FashionInfluencer",
@@ -227,15 +347,56 @@ class OutreachRequest(BaseModel):
                 }
             }
         }
+    )
 
 
-class OutreachResponse(BaseModel):
+class OutreachResponse(FrozenModel):
     status: str
     message: str
     subject: Optional[str] = None
     # Future: add visual, market, media, outreach
 
-class TextInput(BaseModel):
+
+class ContentAwareOutreachRequest(FrozenModel):
+    influencer: Dict[str, Any]
+    brand_name: str
+    product_domain: str
+    target_audience: str
+    message_type: str = "initial_contact"
+    collaboration_idea: Optional[str] = None
+    analyze_content: bool = False
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "influencer": {
+                    "name": "Tech Creator",
+                    "platform": "YouTube",
+                    "url": "https://youtube.com/@creator",
+                    "niche": "tech reviews"
+                },
+                "brand_name": "TechGear Pro",
+                "product_domain": "tech accessories",
+                "target_audience": "tech enthusiasts",
+                "message_type": "casual_dm",
+                "collaboration_idea": "Product review collaboration",
+                "analyze_content": True
+            }
+        }
+    )
+
+
+class ContentAwareOutreachResponse(FrozenModel):
+    status: str
+    influencer_name: str
+    outreach: Dict[str, str]
+    content_analysis: Optional[dict] = None
+
+
+class BatchOutreachRequest(FrozenModel):
+    items: List[ContentAwareOutreachRequest]
+
+class TextInput(FrozenModel):
     text: str = Field(..., min_length=1, max_length=10000)
     
     @validator('text')
@@ -244,7 +405,7 @@ class TextInput(BaseModel):
             raise ValueError('Text cannot be empty')
         return v.strip()
 
-class ExtractionResponse(BaseModel):
+class ExtractionResponse(FrozenModel):
     product: Optional[Dict[str, Any]] = Field(None, description="Detected product with details")
     audience: Dict[str, Any] = Field(default_factory=dict, description="Target audience analysis")
     goals: Dict[str, Any] = Field(default_factory=dict, description="Identified goals with categories")
@@ -254,16 +415,54 @@ class ExtractionResponse(BaseModel):
     key_features: List[str] = Field(default_factory=list, description="Key features mentioned")
     summary: str = Field(..., description="Brief summary of the text")
 
-class SimpleExtractionResponse(BaseModel):
+class SimpleExtractionResponse(FrozenModel):
     product: Optional[str]
     audience: Optional[str]
     goals: List[str]
     tone: Optional[str]
     platform: Optional[str]
 
-class PdfUrlInput(BaseModel):
+class PdfUrlInput(FrozenModel):
     pdf_url: str = Field(..., min_length=10)
 
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def trusted(model: Type[ModelT], **fields: Any) -> ModelT:
+    """
+    Build a response model from agent output without re-validating it.
+    Agent outputs are the trust boundary: requests are validated on the way
+    in, but data this service just produced is not validated a second time.
+    """
+    return model.model_construct(**fields)
+
+
+# Hot endpoints validate the raw body bytes in one pass (pydantic-core parses
+# the JSON itself) instead of FastAPI's json.loads -> dict -> model route.
+_OUTREACH_ADAPTER = TypeAdapter(OutreachRequest)
+_CONTENT_AWARE_OUTREACH_ADAPTER = TypeAdapter(ContentAwareOutreachRequest)
+
+
+def json_body(adapter: TypeAdapter) -> Dict[str, Any]:
+    """openapi_extra documenting a raw-body route with the adapter's schema"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": adapter.json_schema()}}
+        }
+    }
+
+
+async def parse_body(raw: Request, adapter: TypeAdapter):
+    try:
+        return adapter.validate_json(await raw.body())
+    except ValidationError as e:
+        # Same 422 shape FastAPI returns for typed bodies: loc starts with "body"
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
+
 # ---------------- ADVANCED EXTRACTORS ---------------- #
 
 class AdvancedFeatureExtractor:
@@ -594,11 +793,15 @@ async def root():
         "endpoints": {
             "parse_strategy": "/parse-strategy",
             "generate_campaign": "/generate-campaign",
+            "generate_campaign_batch": "/generate-campaign-batch",
             "generate_copy": "/generate-copy",
             "generate_mood_board": "/generate-mood-board",
+            "generate_mood_board_stream": "/generate-mood-board/stream",
             "generate_media_plan": "/generate-media-plan",
             "discover_influencers": "/discover-influencers",
-            "generate_outreach": "/generate-outreach"
+            "generate_outreach": "/generate-outreach",
+            "generate_content_aware_outreach": "/generate-content-aware-outreach",
+            "generate_content_aware_outreach_batch": "/generate-content-aware-outreach/batch"
         }
     }
 
@@ -611,13 +814,15 @@ async def parse_strategy(request: ParseStrategyRequest):
     try:
         logger.info(f"Parsing strategy from {request.input_type} input")
         
-        parser = StrategyParser()
-        result = parser.parse_strategy(
+        parser = get_strategy_parser()
+        result = await MISTRAL_LIMIT.run(
+            parser.parse_strategy,
             input_data=request.input_data,
             input_type=request.input_type
         )
         
-        return ParseStrategyResponse(
+        return trusted(
+            ParseStrategyResponse,
             status="success",
             strategy=result.get("strategy", {}),
             metadata=result.get("metadata", {})
@@ -630,32 +835,59 @@ async def parse_strategy(request: ParseStrategyRequest):
 @app.post("/generate-campaign", response_model=CampaignResponse)
 async def generate_campaign(request: CampaignRequest):
     """
-    Orchestrate campaign generation by calling all agents
+    Orchestrate campaign generation by calling all agents in parallel.
+    A failing agent is reported in `errors` and does not block the others.
     """
-    try:
-        strategy = request.strategy
-        
-        logger.info(f"Generating campaign for product: {strategy.get('product', 'Unknown')}")
-        
-        logger.info("Calling copywriting agent...")
-        copywriting_result = generate_copy(strategy)
-        logger.info("Copywriting agent completed")
-        
-        # Future: Call other agents in parallel
-        # visual_result = generate_visuals(strategy)
-        # market_result = analyze_market(strategy)
-        # media_result = plan_media(strategy)
-        # outreach_result = plan_outreach(strategy)
-        
-        return CampaignResponse(
-            status="success",
-            strategy=strategy,
-            copywriting=copywriting_result
-        )
-        
-    except Exception as e:
-        logger.error(f"Campaign generation error: {e}")
-        raise HTTPException(status_code=500, detail=f"Campaign generation failed: {str(e)}")
+    strategy = request.strategy
+    timings = {}
+    
+    logger.info(f"Generating campaign for product: {strategy.get('product', 'Unknown')}")
+    
+    async def run_agent(name, limit, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            if limit is None:
+                return await run_in_threadpool(func, *args, **kwargs)
+            return await limit.run(func, *args, **kwargs)
+        finally:
+            timings[name] = round(time.perf_counter() - start, 2)
+            logger.info(f"{name} agent finished in {timings[name]}s")
+    
+    # The agents are independent, so latency is max(agents) instead of the sum
+    names = ("copywriting", "mood_board", "media_plan", "influencers")
+    results = await asyncio.gather(
+        run_agent("copywriting", MISTRAL_LIMIT, generate_copy, strategy),
+        # Resolve the agent inside the worker so a missing Gemini key is a per-agent error
+        run_agent("mood_board", GEMINI_LIMIT, lambda: get_visual_agent().generate_mood_board(strategy=strategy, num_variations=4)),
+        run_agent(
+            "media_plan", None, generate_media_plan,
+            domain=strategy.get("stylistics", strategy.get("product", "")),
+            target_audience=strategy.get("audience", ""),
+            competitors=strategy.get("competitors", [])
+        ),
+        run_agent("influencers", MISTRAL_LIMIT, discover_influencers, strategy),
+        return_exceptions=True
+    )
+    
+    outputs, errors = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.error(f"Campaign {name} agent error: {result}")
+            errors[name] = str(result)
+        else:
+            outputs[name] = result
+    
+    if not outputs:
+        raise HTTPException(status_code=500, detail=f"Campaign generation failed: {errors}")
+    
+    return trusted(
+        CampaignResponse,
+        status="success" if not errors else "partial_failure",
+        strategy=strategy,
+        errors=errors or None,
+        timings=timings,
+        **outputs
+    )
 
 @app.post("/generate-copy")
 async def generate_copy_only(request: CampaignRequest):
@@ -664,14 +896,41 @@ async def generate_copy_only(request: CampaignRequest):
     """
     try:
         logger.info("Generating copy only...")
-        result = generate_copy(request.strategy)
+        result = await MISTRAL_LIMIT.run(generate_copy, request.strategy)
         return {"status": "success", "data": result}
     except Exception as e:
         logger.error(f"Copywriting error: {e}")
         raise HTTPException(status_code=500, detail=f"Copywriting failed: {str(e)}")
 
+@app.post("/generate-campaign-batch")
+async def generate_campaign_batch(campaigns: List[CampaignRequest]):
+    """
+    Generate copy for several campaigns concurrently in one round-trip
+    """
+    if len(campaigns) > 100:
+        raise HTTPException(status_code=400, detail="Maximum 100 campaigns per batch")
+
+    logger.info(f"Generating {len(campaigns)} campaigns in batch...")
+    results = await asyncio.gather(
+        *(MISTRAL_LIMIT.run(generate_copy, c.strategy) for c in campaigns),
+        return_exceptions=True
+    )
 
-@app.post("/generate-mood-board", response_model=VisualMoodBoardResponse)
+    batch_results = []
+    for c, result in zip(campaigns, results):
+        if isinstance(result, Exception):
+            logger.error(f"Campaign generation error: {result}")
+            batch_results.append({"status": "error", "strategy": c.strategy, "error": str(result)})
+        else:
+            batch_results.append({"status": "success", "strategy": c.strategy, "copywriting": result})
+
+    return {"results": batch_results, "total": len(batch_results)}
+
+
+# Large payloads (base64 tiles, influencer lists): return an ORJSONResponse
+# directly so FastAPI skips jsonable_encoder and response_model validation.
+# The model is still declared for the OpenAPI docs.
+@app.post("/generate-mood-board", responses={200: {"model": VisualMoodBoardResponse}})
 async def generate_mood_board(request: VisualMoodBoardRequest):
     """
     Generate visual mood board from campaign strategy
@@ -679,27 +938,60 @@ async def generate_mood_board(request: VisualMoodBoardRequest):
     try:
         logger.info(f"Generating mood board for: {request.strategy.get('product', 'Unknown')}")
         
-        visual_agent = VisualAgent()
-        mood_board = visual_agent.generate_mood_board(
+        visual_agent = get_visual_agent()
+        mood_board = await GEMINI_LIMIT.run(
+            visual_agent.generate_mood_board,
             strategy=request.strategy,
             num_variations=request.num_variations,
-            image_size=request.image_size
+            image_size=request.image_size,
+            include_base64=request.include_base64
         )
         
-        return VisualMoodBoardResponse(
-            status=mood_board.get("status", "success"),
-            product=mood_board.get("product", ""),
-            visual_theme=mood_board.get("visual_theme", ""),
-            color_palette=mood_board.get("color_palette", []),
-            tiles=mood_board.get("tiles", []),
-            total_generated=mood_board.get("total_generated", 0)
-        )
+        return ORJSONResponse(content={
+            "status": mood_board.get("status", "success"),
+            "product": mood_board.get("product", ""),
+            "visual_theme": mood_board.get("visual_theme", ""),
+            "color_palette": mood_board.get("color_palette", []),
+            "tiles": mood_board.get("tiles", []),
+            "total_generated": mood_board.get("total_generated", 0),
+            "json_file": mood_board.get("json_file")
+        })
         
     except Exception as e:
         logger.error(f"Mood board generation error: {e}")
         raise HTTPException(status_code=500, detail=f"Mood board generation failed: {str(e)}")
 
 
+@app.post("/generate-mood-board/stream")
+async def generate_mood_board_stream(request: VisualMoodBoardRequest):
+    """
+    Stream a mood board as NDJSON: a header line, one line per tile as it
+    finishes, then a done line. Each tile is flushed and released as soon as
+    it is ready instead of holding every base64 image for one JSON body.
+    """
+    logger.info(f"Streaming mood board for: {request.strategy.get('product', 'Unknown')}")
+    visual_agent = get_visual_agent()
+    
+    # The agent's sync generator is iterated on the threadpool, off the event loop
+    async def ndjson():
+        try:
+            async with GEMINI_LIMIT:
+                events = visual_agent.generate_mood_board_stream(
+                    strategy=request.strategy,
+                    num_variations=request.num_variations,
+                    image_size=request.image_size,
+                    include_base64=request.include_base64
+                )
+                async for event in iterate_in_threadpool(events):
+                    yield orjson.dumps(event) + b"\n"
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            logger.error(f"Mood board stream error: {e}")
+            yield orjson.dumps({"type": "error", "detail": f"Mood board generation failed: {str(e)}"}) + b"\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @app.post("/generate-media-plan", response_model=MediaPlanResponse)
 async def generate_media_plan_endpoint(request: MediaPlanRequest):
     """
@@ -708,9 +1000,10 @@ async def generate_media_plan_endpoint(request: MediaPlanRequest):
     try:
         logger.info(f"Generating media plan for: {request.strategy.get('product', 'Unknown')}")
         
-        media_plan = generate_media_plan(request.strategy)
+        media_plan = await run_in_threadpool(generate_media_plan, request.strategy)
         
-        return MediaPlanResponse(
+        return trusted(
+            MediaPlanResponse,
             status="success",
             platforms=media_plan.get("platforms", []),
             posting_schedule=media_plan.get("posting_schedule", {}),
@@ -723,7 +1016,7 @@ async def generate_media_plan_endpoint(request: MediaPlanRequest):
         raise HTTPException(status_code=500, detail=f"Media plan generation failed: {str(e)}")
 
 
-@app.post("/discover-influencers", response_model=InfluencerDiscoveryResponse)
+@app.post("/discover-influencers", responses={200: {"model": InfluencerDiscoveryResponse}})
 async def discover_influencers_endpoint(request: InfluencerDiscoveryRequest):
     """
     AI-powered influencer discovery based on campaign strategy
@@ -731,34 +1024,38 @@ async def discover_influencers_endpoint(request: InfluencerDiscoveryRequest):
     try:
         logger.info(f"Discovering influencers for: {request.strategy.get('product', 'Unknown')}")
         
-        result = discover_influencers(request.strategy)
+        result = await MISTRAL_LIMIT.run(discover_influencers, request.strategy)
         
-        return InfluencerDiscoveryResponse(
-            status="success",
-            count=len(result.get("influencers", [])),
-            influencers=result.get("influencers", []),
-            metadata=result.get("metadata", {})
-        )
+        influencers = result.get("influencers", [])
+        return ORJSONResponse(content={
+            "status": "success",
+            "count": len(influencers),
+            "influencers": influencers,
+            "metadata": result.get("metadata", {})
+        })
         
     except Exception as e:
         logger.error(f"Influencer discovery error: {e}")
         raise HTTPException(status_code=500, detail=f"Influencer discovery failed: {str(e)}")
 
 
-@app.post("/generate-outreach", response_model=OutreachResponse)
-async def generate_outreach_endpoint(request: OutreachRequest):
+@app.post("/generate-outreach", response_model=OutreachResponse, openapi_extra=json_body(_OUTREACH_ADAPTER))
+async def generate_outreach_endpoint(raw: Request):
     """
     Generate personalized outreach message for influencer
     """
+    request = await parse_body(raw, _OUTREACH_ADAPTER)
     try:
         logger.info(f"Generating outreach for: {request.influencer.get('name', 'Unknown')}")
         
-        message = generate_outreach_message(
+        message = await MISTRAL_LIMIT.run(
+            generate_outreach_message,
             influencer=request.influencer,
             campaign_details=request.campaign_details
         )
         
-        return OutreachResponse(
+        return trusted(
+            OutreachResponse,
             status="success",
             message=message.get("message", ""),
             subject=message.get("subject")
@@ -768,6 +1065,181 @@ async def generate_outreach_endpoint(request: OutreachRequest):
         logger.error(f"Outreach generation error: {e}")
         raise HTTPException(status_code=500, detail=f"Outreach generation failed: {str(e)}")
 
+CONTENT_ANALYSIS_MAX_VIDEOS = 5
+
+# In-flight content analyses keyed by channel URL + video count, so concurrent
+# outreach variants for one creator share a single fetch/summarize
+_content_inflight: Dict[str, asyncio.Future] = {}
+
+# Recent analyses by channel URL + video count, so repeat outreach for a creator
+# skips the YouTube fetch entirely. Only touched from the event loop, so no lock;
+# cached summaries are treated as read-only
+CONTENT_ANALYSIS_CACHE_TTL = 6 * 3600  # seconds; channels post new videos
+CONTENT_ANALYSIS_CACHE_MAXSIZE = 256
+_content_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _content_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    entry = _content_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, content_summary = entry
+    if expires_at <= time.monotonic():
+        del _content_cache[key]
+        return None
+    _content_cache.move_to_end(key)
+    return content_summary
+
+
+def _content_cache_set(key: str, content_summary: Dict[str, Any]) -> None:
+    _content_cache[key] = (time.monotonic() + CONTENT_ANALYSIS_CACHE_TTL, content_summary)
+    _content_cache.move_to_end(key)
+    while len(_content_cache) > CONTENT_ANALYSIS_CACHE_MAXSIZE:
+        _content_cache.popitem(last=False)
+
+
+def _analyze_youtube_content(channel_url: str, max_videos: int) -> Optional[Dict[str, Any]]:
+    """Blocking fetch -> normalize -> summarize; None if analysis fails"""
+    try:
+        logger.info("Fetching and analyzing YouTube content...")
+        raw_content = fetch_youtube_content(
+            channel_url=channel_url,
+            max_videos=max_videos
+        )
+        normalized_content = normalize_content_list(raw_content, "YouTube")
+        content_summary = summarize_content(normalized_content)
+        logger.info("Content analysis complete")
+        return content_summary
+    except Exception as e:
+        logger.warning(f"Content analysis failed, falling back to basic outreach: {e}")
+        return None
+
+
+async def _content_summary_for(channel_url: str, max_videos: int = CONTENT_ANALYSIS_MAX_VIDEOS) -> Optional[Dict[str, Any]]:
+    key = f"{channel_url}|{max_videos}"
+    cached = _content_cache_get(key)
+    if cached is not None:
+        logger.info("Using cached content analysis")
+        return cached
+    
+    future = _content_inflight.get(key)
+    if future is not None:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The request that owned the fetch went away; analysis is optional
+            if future.cancelled():
+                return None
+            raise
+    
+    future = asyncio.get_running_loop().create_future()
+    _content_inflight[key] = future
+    try:
+        # Summaries call Mistral, so hold both limits (always YouTube -> Mistral)
+        async with YOUTUBE_LIMIT:
+            content_summary = await MISTRAL_LIMIT.run(_analyze_youtube_content, channel_url, max_videos)
+        # Failed analyses (None) are retried on the next request
+        if content_summary:
+            _content_cache_set(key, content_summary)
+        future.set_result(content_summary)
+        return content_summary
+    finally:
+        if not future.done():
+            future.cancel()
+        _content_inflight.pop(key, None)
+
+
+def _content_aware_outreach(
+    request: ContentAwareOutreachRequest,
+    content_summary: Optional[Dict[str, Any]] = None
+) -> ContentAwareOutreachResponse:
+    """Blocking outreach generation for one influencer"""
+    influencer = request.influencer
+    logger.info(f"Generating outreach for {influencer.get('name', 'Unknown')}")
+    
+    outreach = generate_outreach_for_influencer(
+        influencer=influencer,
+        brand_name=request.brand_name,
+        product_domain=request.product_domain,
+        target_audience=request.target_audience,
+        message_type=request.message_type,
+        collaboration_idea=request.collaboration_idea,
+        content_summary=content_summary
+    )
+    
+    return trusted(
+        ContentAwareOutreachResponse,
+        status="success",
+        influencer_name=influencer.get('name', 'Unknown'),
+        outreach=outreach,
+        content_analysis=content_summary if request.analyze_content else None
+    )
+
+
+async def _run_content_aware_outreach(request: ContentAwareOutreachRequest) -> ContentAwareOutreachResponse:
+    # Each stage feeds the next: optional (coalesced) content analysis, then
+    # outreach, both off the event loop under their provider limits
+    content_summary = None
+    if request.analyze_content and request.influencer.get('platform') == 'YouTube':
+        content_summary = await _content_summary_for(request.influencer.get('url', ''))
+    return await MISTRAL_LIMIT.run(_content_aware_outreach, request, content_summary)
+
+
+@app.post(
+    "/generate-content-aware-outreach",
+    response_model=ContentAwareOutreachResponse,
+    openapi_extra=json_body(_CONTENT_AWARE_OUTREACH_ADAPTER)
+)
+async def generate_content_aware_outreach(raw: Request):
+    """
+    Generate personalized outreach with optional content analysis
+    
+    If analyze_content=true and influencer is YouTube creator, fetches and analyzes
+    their recent videos to create hyper-personalized outreach referencing actual content.
+    
+    Message types: casual_dm, initial_contact, follow_up, formal_email, partnership_proposal
+    """
+    # Parsed outside the try: ValidationError is a ValueError and must stay a 422
+    request = await parse_body(raw, _CONTENT_AWARE_OUTREACH_ADAPTER)
+    try:
+        return await _run_content_aware_outreach(request)
+        
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Outreach generation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Outreach generation failed: {str(e)}")
+
+
+@app.post("/generate-content-aware-outreach/batch")
+async def generate_content_aware_outreach_batch(request: BatchOutreachRequest):
+    """
+    Generate content-aware outreach for several influencers in one round-trip
+    """
+    if len(request.items) > 100:
+        raise HTTPException(status_code=400, detail="Maximum 100 influencers per batch")
+    
+    logger.info(f"Generating outreach for {len(request.items)} influencers in batch...")
+    results = await asyncio.gather(
+        *(_run_content_aware_outreach(item) for item in request.items),
+        return_exceptions=True
+    )
+    
+    batch_results = []
+    for item, result in zip(request.items, results):
+        if isinstance(result, Exception):
+            logger.error(f"Outreach generation error: {result}")
+            batch_results.append({
+                "status": "error",
+                "influencer_name": item.influencer.get('name', 'Unknown'),
+                "error": str(result)
+            })
+        else:
+            batch_results.append(result)
+    
+    return {"results": batch_results, "total": len(batch_results)}
+
 @app.post("/extract", response_model=ExtractionResponse)
 async def extract_features(data: TextInput):
     """
@@ -851,7 +1323,7 @@ async def extract_from_pdf_url(data: PdfUrlInput):
     Extract features from a PDF URL.
     PDF → text → same NLP pipeline
     """
-    text = pdf_url_to_text(data.pdf_url)
+    text = await run_in_threadpool(pdf_url_to_text, data.pdf_url)
 
     advanced = await extract_features(TextInput(text=text))
     return filter_output(advanced)
@@ -882,15 +1354,53 @@ def pdf_url_to_text(pdf_url: str) -> str:
         logger.error(f"PDF parsing error: {e}")
         raise HTTPException(status_code=400, detail="Failed to parse PDF")
 
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Starting Marketing Campaign Orchestrator & Advanced Text Feature Extractor API...")
-    try:
-        get_nlp()
-        logger.info("API ready")
-    except Exception as e:
-        logger.error(f"Failed to load models: {e}")
+# ---------------- STARTUP WARM-UP ---------------- #
+
+def warm_up_validators() -> None:
+    """Run each request validator once so the first real request skips first-call setup"""
+    _OUTREACH_ADAPTER.validate_json(b'{"influencer": {}, "campaign_details": {}}')
+    _CONTENT_AWARE_OUTREACH_ADAPTER.validate_json(
+        b'{"influencer": {}, "brand_name": "_", "product_domain": "_", "target_audience": "_"}'
+    )
+    for model, payload in (
+        (CampaignRequest, {"strategy": {}}),
+        (ParseStrategyRequest, {"input_data": "_"}),
+        (VisualMoodBoardRequest, {"strategy": {}}),
+        (MediaPlanRequest, {"strategy": {}}),
+        (InfluencerDiscoveryRequest, {"strategy": {}}),
+        (TextInput, {"text": "warmup"}),
+    ):
+        model.model_validate(payload)
+
+
+async def warm_up_agents() -> None:
+    """Prime the shared LLM clients and their connection pools with synthetic calls"""
+    warmup_strategy = {"product": "_warmup", "audience": "_"}
+    # generate_outreach_message reads all four fields while building its prompt
+    warmup_influencer = {"name": "_warmup", "platform": "_", "niche": "_", "reason": "_"}
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        MISTRAL_LIMIT.run(generate_copy, warmup_strategy),
+        MISTRAL_LIMIT.run(generate_outreach_message, influencer=warmup_influencer, campaign_details=warmup_strategy),
+        return_exceptions=True
+    )
+    failed = [str(r) for r in results if isinstance(r, Exception)]
+    if failed:
+        logger.warning(f"Agent warm-up incomplete: {failed}")
+    logger.info(f"Agent warm-up finished in {time.perf_counter() - start:.2f}s")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8001)
\ No newline at end of file
+    # Multiple workers need an import string; each worker loads its own models
+    # and caches and gets 1/WORKERS of the provider quotas. uvloop/httptools are
+    # picked when installed (see requirements).
+    uvicorn.run(
+        "server:app" if WORKERS > 1 else app,
+        host="127.0.0.1",
+        port=8001,
+        workers=WORKERS,
+        loop="auto",
+        http="auto",
+        log_level="info",
+        access_log=False
+    )
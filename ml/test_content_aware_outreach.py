@@ -3,6 +3,7 @@ Test content-aware outreach generation with YouTube content analysis.
 Demonstrates the full pipeline: fetch → normalize → summarize → personalize outreach
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from agents.content_fetchers import fetch_youtube_content
 from agents.content_normalizer import normalize_content_list
 from agents.content_summarizer import summarize_content
@@ -64,8 +65,13 @@ influencer_data = {
     "niche": "technology reviews and insights"
 }
 
+# The three messages are independent LLM calls sharing one content_summary,
+# so run them concurrently; wall-clock is the slowest call, not the sum
+pool = ThreadPoolExecutor(max_workers=3)
+
 # Generate outreach WITH content summary
-outreach_with_content = generate_outreach_for_influencer(
+outreach_with_content_future = pool.submit(
+    generate_outreach_for_influencer,
     influencer=influencer_data,
     brand_name="TechGear Pro",
     product_domain="tech accessories",
@@ -74,14 +80,9 @@ outreach_with_content = generate_outreach_for_influencer(
     content_summary=content_summary  # This makes it content-aware!
 )
 
-print("\n📧 CONTENT-AWARE MESSAGE:")
-print(outreach_with_content['message'])
-
-print("\n\n5. COMPARISON: WITHOUT CONTENT ANALYSIS")
-print("-" * 80)
-
 # Generate outreach WITHOUT content summary (basic)
-outreach_without_content = generate_outreach_for_influencer(
+outreach_without_content_future = pool.submit(
+    generate_outreach_for_influencer,
     influencer=influencer_data,
     brand_name="TechGear Pro",
     product_domain="tech accessories",
@@ -90,13 +91,8 @@ outreach_without_content = generate_outreach_for_influencer(
     # No content_summary provided
 )
 
-print("\n📧 BASIC MESSAGE (without content analysis):")
-print(outreach_without_content['message'])
-
-print("\n\n6. FORMAL EMAIL WITH CONTENT AWARENESS")
-print("-" * 80)
-
-email = generate_outreach_for_influencer(
+email_future = pool.submit(
+    generate_outreach_for_influencer,
     influencer=influencer_data,
     brand_name="TechGear Pro",
     product_domain="tech accessories",
@@ -106,6 +102,23 @@ email = generate_outreach_for_influencer(
     content_summary=content_summary
 )
 
+outreach_with_content = outreach_with_content_future.result()
+print("\n📧 CONTENT-AWARE MESSAGE:")
+print(outreach_with_content['message'])
+
+print("\n\n5. COMPARISON: WITHOUT CONTENT ANALYSIS")
+print("-" * 80)
+
+outreach_without_content = outreach_without_content_future.result()
+print("\n📧 BASIC MESSAGE (without content analysis):")
+print(outreach_without_content['message'])
+
+print("\n\n6. FORMAL EMAIL WITH CONTENT AWARENESS")
+print("-" * 80)
+
+email = email_future.result()
+pool.shutdown()
+
 print(f"\nSubject: {email['subject']}\n")
 print(f"Body:\n{email['message']}")
 
@@ -1,46 +1,132 @@
 """
 Test Visual Agent with Image-to-Image Generation
 User provides a reference image, and the agent generates 4 mood board tiles based on it.
+
+Usage: python test_img2img_moodboard.py --reference ecobottle.webp [--product ...] [--config options.json]
+(run without arguments in a terminal to be prompted instead)
 """
 
+import argparse
+import json
 import os
+import re
 import sys
-from agents.visualAgent import VisualAgent
+from concurrent.futures import ThreadPoolExecutor
+
+# Used when a value is neither passed on the command line nor entered interactively
+DEFAULTS = {
+    "product": "EcoBottle",
+    "audience": "environmentally conscious college students",
+    "tone": "friendly and inspiring",
+    "domain": "sustainability and eco-friendly lifestyle",
+    "num_variations": 4
+}
+
+# Whole-word mention of a person in a tile prompt marks it as user-depicting
+_PERSON_RE = re.compile(r"\b(?:person|people|wom[ae]n|m[ae]n|girls?|boys?)\b", re.IGNORECASE)
+
+
+def _is_person_tile(tile):
+    """True if the tile's prompt depicts a person (shared by console and HTML output)."""
+    return bool(_PERSON_RE.search(tile.get('prompt', '')))
+
+
+def existing_file(path):
+    """argparse type: a path that must already exist (quotes from pasted paths are stripped)."""
+    path = path.strip().strip('"').strip("'")
+    if not os.path.exists(path):
+        raise argparse.ArgumentTypeError(f"File not found: {path}")
+    return path
+
 
-def test_image_to_image_moodboard():
+def parse_args(argv=None):
+    """
+    Parse CLI options. Values from --config (a JSON object with the same keys,
+    e.g. {"reference": "ecobottle.webp", "product": "EcoBottle"}) are used unless
+    overridden by an explicit flag.
+    """
+    parser = argparse.ArgumentParser(description="Generate an image-to-image mood board from a reference image")
+    parser.add_argument("--config", type=existing_file, help="JSON file with any of the options below")
+    parser.add_argument("--reference", type=existing_file, help="Path to the reference image")
+    parser.add_argument("--product", help="Product/Service name (e.g., EcoBottle)")
+    parser.add_argument("--audience", help="Target audience (e.g., college students)")
+    parser.add_argument("--tone", help="Campaign tone (e.g., friendly)")
+    parser.add_argument("--domain", help="Industry/domain (e.g., sustainability)")
+    parser.add_argument("--num-variations", type=int, help="Number of mood board tiles (default: 4)")
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            options = json.load(f)
+        if options.get("reference"):
+            try:
+                options["reference"] = existing_file(options["reference"])
+            except argparse.ArgumentTypeError as e:
+                parser.error(f"--config: {e}")
+
+    for key, value in vars(args).items():
+        if key != "config" and value is not None:
+            options[key] = value
+    return options
+
+
+def test_image_to_image_moodboard(reference=None, product=None, audience=None, tone=None, domain=None, num_variations=None):
     """
     Test mood board generation with a user-provided reference image.
+
+    Missing options are prompted for only when stdin is a terminal; otherwise
+    the defaults are used (and a reference image is required).
     """
+    interactive = sys.stdin.isatty()
+    num_variations = num_variations or DEFAULTS["num_variations"]
     
     print("=" * 80)
     print("VISUAL AGENT - IMAGE-TO-IMAGE MOOD BOARD TEST")
     print("=" * 80)
     
-    # Get reference image from user
-    print("\nPlease provide the path to your reference image:")
-    print(r"(Example: C:\Users\manis\Downloads\HackSync\hacksync_warriors\ml\ecobottle.webp)")
-    
-    reference_image = input("\nReference image path: ").strip()
+    reference_image = reference
+    if not reference_image:
+        if not interactive:
+            print("\n❌ Error: --reference (or \"reference\" in --config) is required when not running interactively")
+            return
+        
+        # Get reference image from user
+        print("\nPlease provide the path to your reference image:")
+        print(r"(Example: C:\Users\manis\Downloads\HackSync\hacksync_warriors\ml\ecobottle.webp)")
+        
+        reference_image = input("\nReference image path: ").strip()
+        
+        # Remove quotes if user pasted path with quotes
+        reference_image = reference_image.strip('"').strip("'")
+        
+        # Validate file exists
+        if not os.path.exists(reference_image):
+            print(f"\n❌ Error: File not found: {reference_image}")
+            return
     
-    # Remove quotes if user pasted path with quotes
-    reference_image = reference_image.strip('"').strip("'")
+    print(f"\n✓ Reference image loaded: {reference_image}")
     
-    # Validate file exists
-    if not os.path.exists(reference_image):
-        print(f"\n❌ Error: File not found: {reference_image}")
-        return
+    # Deferred so bad arguments/paths fail before the agent stack is imported
+    from agents.visualAgent import get_visual_agent
     
-    print(f"\n✓ Reference image loaded: {reference_image}")
+    def ask(value, prompt, key):
+        if value:
+            return value
+        if interactive:
+            return input(prompt).strip() or DEFAULTS[key]
+        return DEFAULTS[key]
     
     # Get campaign details from user
-    print("\n" + "=" * 80)
-    print("CAMPAIGN DETAILS")
-    print("=" * 80)
+    if interactive and not all([product, audience, tone, domain]):
+        print("\n" + "=" * 80)
+        print("CAMPAIGN DETAILS")
+        print("=" * 80)
     
-    product = input("\nProduct/Service name (e.g., EcoBottle): ").strip() or "EcoBottle"
-    audience = input("Target audience (e.g., college students): ").strip() or "environmentally conscious college students"
-    tone = input("Campaign tone (e.g., friendly): ").strip() or "friendly and inspiring"
-    domain = input("Industry/domain (e.g., sustainability): ").strip() or "sustainability and eco-friendly lifestyle"
+    product = ask(product, "\nProduct/Service name (e.g., EcoBottle): ", "product")
+    audience = ask(audience, "Target audience (e.g., college students): ", "audience")
+    tone = ask(tone, "Campaign tone (e.g., friendly): ", "tone")
+    domain = ask(domain, "Industry/domain (e.g., sustainability): ", "domain")
     
     # Create strategy
     strategy = {
@@ -58,18 +144,24 @@ def test_image_to_image_moodboard():
     print(f"Tone: {tone}")
     print(f"Domain: {domain}")
     print(f"Reference Image: {reference_image}")
-    print(f"\nGenerating 4 mood board tiles (1 will depict target audience)...")
+    print(f"\nGenerating {num_variations} mood board tiles (1 will depict target audience)...")
     
     # Initialize agent
-    agent = VisualAgent()
+    agent = get_visual_agent()
     
     # Generate mood board with reference image
     mood_board = agent.generate_mood_board(
         strategy=strategy,
-        num_variations=4,
+        num_variations=num_variations,
         reference_image_path=reference_image
     )
     
+    # The preview only needs the finished mood board (tile images are already
+    # on disk), so build and write it while the report below prints
+    preview = ThreadPoolExecutor(max_workers=1)
+    html_path = preview.submit(_write_html_preview, mood_board)
+    preview.shutdown(wait=False)
+    
     # Display results
     print("\n" + "=" * 80)
     print("MOOD BOARD GENERATED")
@@ -86,7 +178,7 @@ def test_image_to_image_moodboard():
     
     for i, tile in enumerate(mood_board['tiles'], 1):
         print(f"\nTile {i}:")
-        print(f"  Type: {'👤 USER-DEPICTING' if tile.get('prompt', '').find('person') >= 0 or tile.get('prompt', '').find('woman') >= 0 or tile.get('prompt', '').find('man') >= 0 else '📦 PRODUCT'}")
+        print(f"  Type: {'👤 USER-DEPICTING' if _is_person_tile(tile) else '📦 PRODUCT'}")
         print(f"  Mood: {tile['mood']}")
         print(f"  Style: {tile['style']}")
         print(f"  Provider: {tile.get('provider', 'unknown')}")
@@ -98,20 +190,14 @@ def test_image_to_image_moodboard():
     print(f"✓ Images saved in: {agent.output_dir}/")
     print("=" * 80)
     
-    # Create simple HTML preview
-    create_html_preview(mood_board)
+    # Simple HTML preview, written in the background above
+    _report_html_preview(html_path.result())
 
 
-def create_html_preview(mood_board):
-    """Create a simple HTML preview of the mood board."""
-    
-    product = mood_board.get('product', 'N/A')
-    audience = mood_board.get('audience', 'N/A')
-    tone = mood_board.get('tone', 'N/A')
-    theme = mood_board.get('visual_theme', 'N/A')
-    colors = ', '.join(mood_board.get('color_palette', []))
-    
-    html = f"""<!DOCTYPE html>
+# Preview page and tile markup, defined once and filled via str.format
+# (CSS braces are doubled here rather than in an f-string built per call);
+# the tile cards are streamed to the file between the head and the tail
+_HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
     <title>Mood Board - Image-to-Image Generation</title>
@@ -145,41 +231,82 @@ def create_html_preview(mood_board):
         
         <div class="grid">
 """
-    
-    for i, tile in enumerate(mood_board['tiles'], 1):
-        is_user_depicting = any(word in tile.get('prompt', '').lower() for word in ['person', 'woman', 'man', 'girl', 'boy', 'people'])
-        tile_class = 'user-depicting' if is_user_depicting else ''
-        badge_class = 'user' if is_user_depicting else 'product'
-        badge_text = '👤 User Depicting' if is_user_depicting else '📦 Product Focus'
-        
-        html += f"""
+
+_HTML_TAIL = """
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+_TILE_HTML = """
             <div class="tile {tile_class}">
                 <span class="badge {badge_class}">{badge_text}</span>
-                <img src="../{tile.get('image_url', '')}" alt="Tile {i}">
-                <h3>Tile {i}: {tile['mood'].title()}</h3>
+                <img src="../{image_url}" alt="Tile {i}">
+                <h3>Tile {i}: {mood}</h3>
                 <div class="details">
-                    <strong>Style:</strong> {tile['style']}<br>
-                    <strong>Provider:</strong> {tile.get('provider', 'unknown')}<br>
-                    <strong>Prompt:</strong> {tile['prompt'][:120]}...
+                    <strong>Style:</strong> {style}<br>
+                    <strong>Provider:</strong> {provider}<br>
+                    <strong>Prompt:</strong> {prompt}...
                 </div>
             </div>
 """
+
+# (tile class, badge class, badge text) by whether the tile depicts a person
+_TILE_BADGES = {
+    True: ('user-depicting', 'user', '👤 User Depicting'),
+    False: ('', 'product', '📦 Product Focus'),
+}
+
+
+def _render_tile(i, tile):
+    """Render one mood board tile as an HTML card."""
+    tile_class, badge_class, badge_text = _TILE_BADGES[_is_person_tile(tile)]
     
-    html += """
-        </div>
-    </div>
-</body>
-</html>
-"""
+    return _TILE_HTML.format(
+        i=i,
+        tile_class=tile_class,
+        badge_class=badge_class,
+        badge_text=badge_text,
+        image_url=tile.get('image_url', ''),
+        mood=tile['mood'].title(),
+        style=tile['style'],
+        provider=tile.get('provider', 'unknown'),
+        prompt=tile['prompt'][:120]
+    )
+
+
+def _write_html_preview(mood_board):
+    """Render and save the HTML preview of the mood board; returns its path."""
     
-    # Save HTML file
     html_path = "generated_images/mood_board_img2img_preview.html"
+    
+    # Stream head, tile cards and tail through the file buffer, so memory
+    # stays at one tile's markup however large the board gets
     with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html)
+        f.write(_HTML_HEAD.format(
+            product=mood_board.get('product', 'N/A'),
+            audience=mood_board.get('audience', 'N/A'),
+            tone=mood_board.get('tone', 'N/A'),
+            theme=mood_board.get('visual_theme', 'N/A'),
+            colors=', '.join(mood_board.get('color_palette', []))
+        ))
+        for i, tile in enumerate(mood_board['tiles'], 1):
+            f.write(_render_tile(i, tile))
+        f.write(_HTML_TAIL)
     
+    return html_path
+
+
+def _report_html_preview(html_path):
     print(f"\n✓ HTML Preview: {html_path}")
     print("  Open this file in your browser to view the mood board\n")
 
 
+def create_html_preview(mood_board):
+    """Create a simple HTML preview of the mood board."""
+    _report_html_preview(_write_html_preview(mood_board))
+
+
 if __name__ == "__main__":
-    test_image_to_image_moodboard()
+    test_image_to_image_moodboard(**parse_args())
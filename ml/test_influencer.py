@@ -6,8 +6,8 @@ Before running:
 2. Install dependencies: pip install -r requirements.txt
 """
 
-from hacksync_warriors.ml.influencer_scraper import scrape_influencers
-import json
+from influencer_scraper import scrape_influencers
+from json_output import save_json
 
 
 def test_scraper():
@@ -42,8 +42,7 @@ def test_scraper():
             print()
         
         # Save to JSON
-        with open('influencers_output.json', 'w') as f:
-            json.dump(influencers, f, indent=2)
+        save_json(influencers, 'influencers_output.json')
         
         print(f"💾 Results saved to influencers_output.json")
         
@@ -2,8 +2,9 @@
 Test Market Agent - Google Custom Search API for Influencer Discovery
 """
 
-from hacksync_warriors.ml.market import analyze_market, find_influencers
-import json
+from market import analyze_market, find_influencers
+from json_output import save_json
+
 
 print("\n" + "="*60)
 print("TESTING MARKET AGENT (Google Custom Search)")
@@ -61,7 +62,6 @@ for rec in market_result['recommendations']:
     print(f"  • {rec}")
 
 # Save results
-with open("market_test_output.json", "w", encoding="utf-8") as f:
-    json.dump(market_result, f, indent=2, ensure_ascii=False)
+save_json(market_result, "market_test_output.json")
 
 print(f"\n✅ Saved results to market_test_output.json")
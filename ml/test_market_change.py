@@ -1,7 +1,8 @@
 # Test the improved market_change.py
 
-from agents.market_change import analyze_market
 import json
+from json_output import save_json
+
 
 print("\n" + "="*60)
 print("TESTING IMPROVED MARKET ANALYSIS")
@@ -20,7 +21,9 @@ print("Strategy:")
 print(json.dumps(test_strategy, indent=2))
 print("\n" + "="*60 + "\n")
 
-# Run analysis
+# Run analysis (agent imported here so the script starts printing immediately)
+from agents.market_change import analyze_market
+
 result = analyze_market(test_strategy)
 
 # Display results
@@ -48,7 +51,6 @@ for rec in result['recommendations']:
     print(f"  • {rec}")
 
 # Save output
-with open("market_change_test_output.json", "w", encoding="utf-8") as f:
-    json.dump(result, f, indent=2, ensure_ascii=False)
+save_json(result, "market_change_test_output.json")
 
 print(f"\n💾 Saved to market_change_test_output.json")
@@ -6,16 +6,20 @@ Test the integrated orchestrator endpoints:
 
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+from http_retry import request_with_backoff
 
 BASE_URL = "http://127.0.0.1:8001"
 
+# One keep-alive connection pool shared by all probes
+session = requests.Session()
+
+
 print("=" * 80)
 print("TESTING ORCHESTRATOR v2.0 - NEW ENDPOINTS")
 print("=" * 80)
 
-print("\n1. TESTING MARKET DISCOVERY (Google Search)")
-print("-" * 80)
-
 market_request = {
     "domain": "women's fashion",
     "target_audience": "young women aged 18-30",
@@ -24,8 +28,51 @@ market_request = {
     "max_results": 5
 }
 
+outreach_request_basic = {
+    "influencer": {
+        "name": "Fashion Influencer",
+        "platform": "Instagram",
+        "url": "https://instagram.com/fashioninfluencer",
+        "niche": "women's fashion and styling"
+    },
+    "brand_name": "StyleHub",
+    "product_domain": "women's fashion",
+    "target_audience": "young women aged 18-30",
+    "message_type": "casual_dm",
+    "analyze_content": False
+}
+
+outreach_request_content_aware = {
+    "influencer": {
+        "name": "MKBHD",
+        "platform": "YouTube",
+        "url": "https://www.youtube.com/@mkbhd",
+        "niche": "technology reviews"
+    },
+    "brand_name": "TechGear Pro",
+    "product_domain": "tech accessories",
+    "target_audience": "tech enthusiasts",
+    "message_type": "formal_email",
+    "collaboration_idea": "Product review series for wireless charging accessories",
+    "analyze_content": True
+}
+
+# The probes are independent, so issue them together: total time is the
+# slowest call (the YouTube analysis) rather than the sum
+print("\nDispatching all requests... (content analysis may take 10-20 seconds)")
+executor = ThreadPoolExecutor(max_workers=3)
+futures = {
+    "market": executor.submit(request_with_backoff, session, "POST", f"{BASE_URL}/discover-market-influencers", json=market_request),
+    "basic": executor.submit(request_with_backoff, session, "POST", f"{BASE_URL}/generate-content-aware-outreach", json=outreach_request_basic),
+    "content_aware": executor.submit(request_with_backoff, session, "POST", f"{BASE_URL}/generate-content-aware-outreach", json=outreach_request_content_aware),
+}
+executor.shutdown(wait=False)
+
+print("\n1. TESTING MARKET DISCOVERY (Google Search)")
+print("-" * 80)
+
 try:
-    response = requests.post(f"{BASE_URL}/discover-market-influencers", json=market_request)
+    response = futures["market"].result()
     if response.status_code == 200:
         data = response.json()
         print(f"✓ Status: {data['status']}")
@@ -47,22 +94,8 @@ except Exception as e:
 print("\n\n2. TESTING BASIC OUTREACH (No Content Analysis)")
 print("-" * 80)
 
-outreach_request_basic = {
-    "influencer": {
-        "name": "Fashion Influencer",
-        "platform": "Instagram",
-        "url": "https://instagram.com/fashioninfluencer",
-        "niche": "women's fashion and styling"
-    },
-    "brand_name": "StyleHub",
-    "product_domain": "women's fashion",
-    "target_audience": "young women aged 18-30",
-    "message_type": "casual_dm",
-    "analyze_content": False
-}
-
 try:
-    response = requests.post(f"{BASE_URL}/generate-content-aware-outreach", json=outreach_request_basic)
+    response = futures["basic"].result()
     if response.status_code == 200:
         data = response.json()
         print(f"✓ Status: {data['status']}")
@@ -78,24 +111,8 @@ except Exception as e:
 print("\n\n3. TESTING CONTENT-AWARE OUTREACH (With YouTube Analysis)")
 print("-" * 80)
 
-outreach_request_content_aware = {
-    "influencer": {
-        "name": "MKBHD",
-        "platform": "YouTube",
-        "url": "https://www.youtube.com/@mkbhd",
-        "niche": "technology reviews"
-    },
-    "brand_name": "TechGear Pro",
-    "product_domain": "tech accessories",
-    "target_audience": "tech enthusiasts",
-    "message_type": "formal_email",
-    "collaboration_idea": "Product review series for wireless charging accessories",
-    "analyze_content": True
-}
-
 try:
-    print("Analyzing YouTube content... (this may take 10-20 seconds)")
-    response = requests.post(f"{BASE_URL}/generate-content-aware-outreach", json=outreach_request_content_aware)
+    response = futures["content_aware"].result()
     if response.status_code == 200:
         data = response.json()
         print(f"\n✓ Status: {data['status']}")
@@ -4,35 +4,53 @@ Test Orchestrator with Reasoning Wrapper
 
 import requests
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from http_retry import request_with_backoff
 
 BASE_URL = "http://127.0.0.1:8001"
 
-def test_copywriting_with_reasoning():
-    """Test copywriting agent with reasoning"""
+# One keep-alive connection pool shared by all tests
+session = requests.Session()
+
+COPY_STRATEGY = {
+    "product": "EcoBottle - Sustainable Water Bottle",
+    "audience": "environmentally conscious college students",
+    "goal": "increase brand awareness",
+    "tone": "friendly and inspiring",
+    "platforms": ["Instagram", "TikTok"],
+    "stylistics": "focus on sustainability and Gen Z lifestyle"
+}
+
+MEDIA_PLAN_REQUEST = {
+    "domain": "sustainable fashion",
+    "target_audience": "environmentally conscious college students",
+    "competitors": ["Everlane", "Patagonia", "Reformation"]
+}
+
+
+def request_copy() -> requests.Response:
+    return request_with_backoff(session, "POST", f"{BASE_URL}/generate-copy", json={"strategy": COPY_STRATEGY}, timeout=60)
+
+
+def request_media_plan() -> requests.Response:
+    return request_with_backoff(session, "POST", f"{BASE_URL}/generate-media-plan", json=MEDIA_PLAN_REQUEST, timeout=30)
+
+
+def test_copywriting_with_reasoning(pending: Optional[Future] = None):
+    """Test copywriting agent with reasoning (pending: an already-dispatched request_copy)"""
     print("=" * 80)
     print("TEST 1: COPYWRITING AGENT WITH REASONING")
     print("=" * 80)
     
-    strategy = {
-        "product": "EcoBottle - Sustainable Water Bottle",
-        "audience": "environmentally conscious college students",
-        "goal": "increase brand awareness",
-        "tone": "friendly and inspiring",
-        "platforms": ["Instagram", "TikTok"],
-        "stylistics": "focus on sustainability and Gen Z lifestyle"
-    }
-    
     print("\n📝 Strategy:")
-    print(json.dumps(strategy, indent=2))
+    print(json.dumps(COPY_STRATEGY, indent=2))
     
     print("\n🔄 Calling /generate-copy endpoint...")
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/generate-copy",
-            json={"strategy": strategy},
-            timeout=60
-        )
+        response = pending.result() if pending else request_copy()
         
         if response.status_code == 200:
             data = response.json()
@@ -59,29 +77,19 @@ def test_copywriting_with_reasoning():
         print(f"\n❌ Error: {str(e)}")
 
 
-def test_media_planning_with_reasoning():
-    """Test media planning agent with reasoning"""
+def test_media_planning_with_reasoning(pending: Optional[Future] = None):
+    """Test media planning agent with reasoning (pending: an already-dispatched request_media_plan)"""
     print("\n" + "=" * 80)
     print("TEST 2: MEDIA PLANNING AGENT WITH REASONING")
     print("=" * 80)
     
-    request_data = {
-        "domain": "sustainable fashion",
-        "target_audience": "environmentally conscious college students",
-        "competitors": ["Everlane", "Patagonia", "Reformation"]
-    }
-    
     print("\n📝 Input:")
-    print(json.dumps(request_data, indent=2))
+    print(json.dumps(MEDIA_PLAN_REQUEST, indent=2))
     
     print("\n🔄 Calling /generate-media-plan endpoint...")
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/generate-media-plan",
-            json=request_data,
-            timeout=30
-        )
+        response = pending.result() if pending else request_media_plan()
         
         if response.status_code == 200:
             data = response.json()
@@ -113,9 +121,9 @@ def test_media_planning_with_reasoning():
 
 
 def check_server_status():
-    """Check if orchestrator is running"""
+    """Check if orchestrator is running (one quick retry, so a down server is reported fast)"""
     try:
-        response = requests.get(f"{BASE_URL}/", timeout=5)
+        response = request_with_backoff(session, "GET", f"{BASE_URL}/", attempts=2, timeout=(2, 5))
         if response.status_code == 200:
             data = response.json()
             print(f"\n✅ Orchestrator is running (version {data['version']})")
@@ -138,8 +146,12 @@ if __name__ == "__main__":
     
     if check_server_status():
         print("\n")
-        test_copywriting_with_reasoning()
-        test_media_planning_with_reasoning()
+        # Both agents are independent: dispatch together, report in order
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            copy_future = executor.submit(request_copy)
+            media_plan_future = executor.submit(request_media_plan)
+            test_copywriting_with_reasoning(copy_future)
+            test_media_planning_with_reasoning(media_plan_future)
         
         print("\n" + "=" * 80)
         print("✅ TESTS COMPLETE")
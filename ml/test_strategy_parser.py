@@ -1,5 +1,5 @@
 """Test Strategy Parser"""
-from agents.strategyParser import StrategyParser
+from agents.strategyParser import get_strategy_parser
 import json
 
 # Test 1: Text input
@@ -10,7 +10,7 @@ print("TEST 1: TEXT INPUT")
 print("=" * 80)
 print(f"\nInput:\n{text_input}\n")
 
-parser = StrategyParser()
+parser = get_strategy_parser()
 result1 = parser.parse_strategy(text_input, input_type="text")
 
 print("RESULT:")
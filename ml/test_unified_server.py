@@ -2,26 +2,103 @@
 Test Unified Server.py - All Endpoints
 """
 
+import argparse
+import hashlib
+import os
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import orjson
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Optional
 
 BASE_URL = "http://127.0.0.1:8001"
 
+# Parsed strategies keyed by request payload; the parse input is fixed, so
+# repeat runs skip the LLM-backed /parse-strategy call (--no-cache to refresh)
+STRATEGY_CACHE_DIR = Path(".cache") / "parse_strategy"
+
+# One keep-alive connection pool shared by every endpoint test
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0))
+
+# (connect, read) seconds per endpoint: a dead server fails fast, and a hung
+# endpoint can't stall the suite indefinitely
+TIMEOUTS = {
+    "/": (2, 5),
+    "/parse-strategy": (2, 30),
+    "/generate-copy": (2, 60),
+    "/generate-mood-board": (2, 180),
+    "/generate-media-plan": (2, 45),
+    "/discover-influencers": (2, 60),
+    "/generate-campaign": (2, 240),
+}
+
+
+def post(path, payload):
+    return session.post(
+        f"{BASE_URL}{path}",
+        data=orjson.dumps(payload),
+        headers={"Content-Type": "application/json"},
+        timeout=TIMEOUTS[path],
+    )
+
+
+def body(response):
+    """Decode a JSON response with orjson (mood boards carry MBs of base64)."""
+    return orjson.loads(response.content)
+
+
+def fetch(path, payload, pending: Optional[Future] = None):
+    """POST path (or wait for an already-dispatched request); None if it timed out."""
+    try:
+        return pending.result() if pending else post(path, payload)
+    except requests.exceptions.Timeout:
+        print(f"Error: {path} timed out (connect/read limits {TIMEOUTS[path]}s)")
+        return None
+
+
+# Payload builders, shared by the tests and the concurrent dispatch in __main__
+def copy_payload(strategy):
+    return {"strategy": strategy}
+
+
+def mood_board_payload(strategy):
+    return {
+        "strategy": strategy,
+        "num_variations": 2,  # Just 2 for testing
+        "image_size": "1024x1024"
+    }
+
+
+def media_plan_payload(strategy):
+    return {"strategy": strategy}
+
+
+def influencers_payload(strategy):
+    return {"strategy": {**strategy, "location": "India"}}
+
+
 def test_health_check():
     """Test server health"""
     print("\n" + "="*80)
     print("TEST 1: Health Check")
     print("="*80)
     
-    response = requests.get(f"{BASE_URL}/")
+    try:
+        response = session.get(f"{BASE_URL}/", timeout=TIMEOUTS["/"])
+    except requests.exceptions.Timeout:
+        print("Error: health check timed out")
+        return False
     print(f"Status Code: {response.status_code}")
-    print(f"Response:\n{json.dumps(response.json(), indent=2)}")
+    print(f"Response:\n{json.dumps(body(response), indent=2)}")
     
     return response.status_code == 200
 
 
-def test_parse_strategy():
-    """Test strategy parser"""
+def test_parse_strategy(use_cache=True):
+    """Test strategy parser (use_cache: reuse a previously parsed strategy for the same input)"""
     print("\n" + "="*80)
     print("TEST 2: Parse Strategy")
     print("="*80)
@@ -31,21 +108,48 @@ def test_parse_strategy():
         "input_type": "text"
     }
     
-    response = requests.post(f"{BASE_URL}/parse-strategy", json=payload)
+    key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    cache_path = STRATEGY_CACHE_DIR / f"{key}.json"
+    if use_cache:
+        try:
+            strategy = json.loads(cache_path.read_bytes())["strategy"]
+            print("Strategy Parsed (cached - pass --no-cache to re-parse):")
+            print(json.dumps(strategy, indent=2))
+            return strategy
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    response = fetch("/parse-strategy", payload)
+    if response is None:
+        return None
     print(f"Status Code: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
+        data = body(response)
+        strategy = data.get('strategy', {})
         print(f"Strategy Parsed:")
-        print(json.dumps(data.get('strategy', {}), indent=2))
-        return data.get('strategy', {})
+        print(json.dumps(strategy, indent=2))
+        if strategy:
+            _save_cached_strategy(cache_path, strategy)
+        return strategy
     else:
         print(f"Error: {response.text}")
         return None
 
 
-def test_generate_copy(strategy):
-    """Test copywriting agent"""
+def _save_cached_strategy(cache_path, strategy):
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so an interrupted run never leaves a partial file
+        tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"strategy": strategy}, indent=2), encoding="utf-8")
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        print(f"Could not cache strategy: {e}")
+
+
+def test_generate_copy(strategy, pending: Optional[Future] = None):
+    """Test copywriting agent (pending: an already-dispatched request)"""
     print("\n" + "="*80)
     print("TEST 3: Generate Copy")
     print("="*80)
@@ -54,21 +158,23 @@ def test_generate_copy(strategy):
         print("Skipping - no strategy available")
         return
     
-    payload = {"strategy": strategy}
+    payload = copy_payload(strategy)
     
-    response = requests.post(f"{BASE_URL}/generate-copy", json=payload)
+    response = fetch("/generate-copy", payload, pending)
+    if response is None:
+        return
     print(f"Status Code: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
+        data = body(response)
         print(f"Copy Generated: ✓")
         print(f"Sample: {str(data)[:200]}...")
     else:
         print(f"Error: {response.text}")
 
 
-def test_generate_mood_board(strategy):
-    """Test visual agent"""
+def test_generate_mood_board(strategy, pending: Optional[Future] = None):
+    """Test visual agent (pending: an already-dispatched request)"""
     print("\n" + "="*80)
     print("TEST 4: Generate Mood Board")
     print("="*80)
@@ -77,19 +183,17 @@ def test_generate_mood_board(strategy):
         print("Skipping - no strategy available")
         return
     
-    payload = {
-        "strategy": strategy,
-        "num_variations": 2,  # Just 2 for testing
-        "image_size": "1024x1024"
-    }
+    payload = mood_board_payload(strategy)
     
     print("Generating mood board (this may take 30-60 seconds)...")
     
-    response = requests.post(f"{BASE_URL}/generate-mood-board", json=payload, timeout=120)
+    response = fetch("/generate-mood-board", payload, pending)
+    if response is None:
+        return
     print(f"Status Code: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
+        data = body(response)
         print(f"Mood Board Generated: ✓")
         print(f"Status: {data.get('status')}")
         print(f"Images: {data.get('total_generated')}/{payload['num_variations']}")
@@ -98,8 +202,8 @@ def test_generate_mood_board(strategy):
         print(f"Error: {response.text}")
 
 
-def test_generate_media_plan(strategy):
-    """Test media planning agent"""
+def test_generate_media_plan(strategy, pending: Optional[Future] = None):
+    """Test media planning agent (pending: an already-dispatched request)"""
     print("\n" + "="*80)
     print("TEST 5: Generate Media Plan")
     print("="*80)
@@ -108,13 +212,15 @@ def test_generate_media_plan(strategy):
         print("Skipping - no strategy available")
         return
     
-    payload = {"strategy": strategy}
+    payload = media_plan_payload(strategy)
     
-    response = requests.post(f"{BASE_URL}/generate-media-plan", json=payload)
+    response = fetch("/generate-media-plan", payload, pending)
+    if response is None:
+        return
     print(f"Status Code: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
+        data = body(response)
         print(f"Media Plan Generated: ✓")
         print(f"Platforms: {len(data.get('platforms', []))}")
         print(f"Top Platform: {data.get('platforms', [{}])[0].get('name', 'N/A')}")
@@ -122,8 +228,8 @@ def test_generate_media_plan(strategy):
         print(f"Error: {response.text}")
 
 
-def test_discover_influencers(strategy):
-    """Test influencer discovery"""
+def test_discover_influencers(strategy, pending: Optional[Future] = None):
+    """Test influencer discovery (pending: an already-dispatched request)"""
     print("\n" + "="*80)
     print("TEST 6: Discover Influencers")
     print("="*80)
@@ -132,13 +238,15 @@ def test_discover_influencers(strategy):
         print("Skipping - no strategy available")
         return
     
-    payload = {"strategy": {**strategy, "location": "India"}}
+    payload = influencers_payload(strategy)
     
-    response = requests.post(f"{BASE_URL}/discover-influencers", json=payload)
+    response = fetch("/discover-influencers", payload, pending)
+    if response is None:
+        return
     print(f"Status Code: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
+        data = body(response)
         print(f"Influencers Discovered: ✓")
         print(f"Count: {data.get('count', 0)}")
         if data.get('influencers'):
@@ -147,7 +255,41 @@ def test_discover_influencers(strategy):
         print(f"Error: {response.text}")
 
 
+def test_generate_campaign(strategy):
+    """Test the orchestrator: copy, mood board, media plan and influencers in one request"""
+    print("\n" + "="*80)
+    print("TEST 3-6: Generate Campaign (all agents, one request)")
+    print("="*80)
+    
+    if not strategy:
+        print("Skipping - no strategy available")
+        return
+    
+    print("Generating campaign (this may take 30-60 seconds)...")
+    
+    response = fetch("/generate-campaign", {"strategy": strategy})
+    if response is None:
+        return
+    print(f"Status Code: {response.status_code}")
+    
+    if response.status_code == 200:
+        data = body(response)
+        print(f"Campaign Status: {data.get('status')}")
+        errors = data.get('errors') or {}
+        timings = data.get('timings') or {}
+        for name in ("copywriting", "mood_board", "media_plan", "influencers"):
+            outcome = f"✗ {errors[name]}" if name in errors else "✓"
+            print(f"  {name}: {outcome} ({timings.get(name, 'N/A')}s)")
+    else:
+        print(f"Error: {response.text}")
+
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run the unified server endpoint tests")
+    arg_parser.add_argument("--no-cache", action="store_true", help="Always call /parse-strategy instead of reusing a cached strategy")
+    arg_parser.add_argument("--campaign", action="store_true", help="Exercise all agents through one /generate-campaign request instead of four endpoint calls")
+    args = arg_parser.parse_args()
+    
     print("\n" + "="*80)
     print("UNIFIED SERVER TEST SUITE")
     print("Testing server.py on http://127.0.0.1:8001")
@@ -160,13 +302,37 @@ if __name__ == "__main__":
             exit(1)
         
         # Parse strategy (foundation for other tests)
-        strategy = test_parse_strategy()
+        strategy = test_parse_strategy(use_cache=not args.no_cache)
         
-        # Test other endpoints
-        test_generate_copy(strategy)
-        test_generate_mood_board(strategy)
-        test_generate_media_plan(strategy)
-        test_discover_influencers(strategy)
+        if args.campaign:
+            # One round-trip; the server fans the agents out itself
+            test_generate_campaign(strategy)
+        else:
+            # The remaining endpoints only depend on the strategy: dispatch them
+            # together (total time ~ the mood board) and report each one as it
+            # finishes, so the fast endpoints aren't held behind the mood board
+            tests = {
+                "/generate-copy": (test_generate_copy, copy_payload),
+                "/generate-mood-board": (test_generate_mood_board, mood_board_payload),
+                "/generate-media-plan": (test_generate_media_plan, media_plan_payload),
+                "/discover-influencers": (test_discover_influencers, influencers_payload),
+            }
+            if not strategy:
+                for test, _ in tests.values():
+                    test(strategy)
+            else:
+                with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+                    pending = {
+                        executor.submit(post, path, build(strategy)): path
+                        for path, (test, build) in tests.items()
+                    }
+                    for future in as_completed(pending):
+                        path = pending[future]
+                        # One failing endpoint shouldn't hide the others' results
+                        try:
+                            tests[path][0](strategy, future)
+                        except Exception as e:
+                            print(f"\n✗ {path} failed: {e}")
         
         print("\n" + "="*80)
         print("✓ ALL TESTS COMPLETED")
@@ -4,53 +4,90 @@ Tests mood board generation and saves images only (no HTML)
 """
 
 import os
+import sys
 import base64
-from agents.visualAgent import VisualAgent
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import json
 
+# Spaces and path/drive separators in mood/style become underscores in one pass
+_FNAME_TRANS = str.maketrans({' ': '_', '/': '_', ':': '_', '\\': '_'})
+
+
+def _write_file(filepath, data):
+    """Write bytes through an unbuffered binary file: no Python-side copy, usually one write() syscall."""
+    view = memoryview(data)
+    # "wb" keeps the fd in binary mode on Windows (a bare os.open would translate newlines)
+    with open(filepath, "wb", buffering=0) as f:
+        while view:
+            # A raw write may write less than asked (large buffers, signals)
+            view = view[f.write(view):]
+
+
+def _save_tile(i, tile, output_dir):
+    """Decode one tile's base64 image and write it; returns (filepath, size in bytes)."""
+    # Skip a data URI prefix ("data:image/...;base64,") without scanning the payload
+    base64_str = tile['base64']
+    start = base64_str.index(',', 0, 64) + 1 if base64_str.startswith('data:') else 0
+    
+    image_data = base64.b64decode(base64_str[start:])
+    
+    # Create filename
+    mood = tile['mood'].translate(_FNAME_TRANS)
+    style = tile['style'].translate(_FNAME_TRANS)
+    # Tiles are stored as WebP; name the file after the format actually returned
+    extension = tile.get('mime_type', 'image/png').split('/')[-1].replace('jpeg', 'jpg')
+    filename = f"tile_{i}_{mood}_{style}.{extension}"
+    filepath = output_dir / filename
+    
+    # Save image
+    _write_file(filepath, image_data)
+    
+    return str(filepath), len(image_data)
+
+
 def save_images_from_mood_board(mood_board, output_dir="mood_board_images"):
-    """Save images from mood board as PNG files"""
-    os.makedirs(output_dir, exist_ok=True)
+    """Save images from mood board in their returned format (decoded and written in parallel)"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     print(f"\n{'=' * 80}")
     print("SAVING IMAGES")
     print(f"{'=' * 80}")
     
     saved_files = []
+    tiles = mood_board.get('tiles', [])
+    # Per-tile report lines, written to stdout in one go once all tiles are saved
+    log = []
     
-    for i, tile in enumerate(mood_board.get('tiles', []), 1):
-        if tile.get('base64'):
-            # Decode base64 to binary
+    with ThreadPoolExecutor(max_workers=min(8, len(tiles)) or 1) as executor:
+        futures = {
+            i: executor.submit(_save_tile, i, tile, output_dir)
+            for i, tile in enumerate(tiles, 1) if tile.get('base64')
+        }
+        
+        # Report in tile order
+        for i, tile in enumerate(tiles, 1):
+            if i not in futures:
+                log.append(f"\n✗ Tile {i} has no image data")
+                continue
+            
             try:
-                # Remove data URI prefix if present
-                base64_str = tile['base64']
-                if ',' in base64_str:
-                    base64_str = base64_str.split(',', 1)[1]
-                
-                image_data = base64.b64decode(base64_str)
-                
-                # Create filename
-                mood = tile['mood'].replace(' ', '_')
-                style = tile['style'].replace(' ', '_')
-                filename = f"tile_{i}_{mood}_{style}.png"
-                filepath = os.path.join(output_dir, filename)
-                
-                # Save image
-                with open(filepath, 'wb') as f:
-                    f.write(image_data)
-                
-                size_kb = len(image_data) / 1024
-                print(f"\n✓ Saved: {filename} ({size_kb:.1f} KB)")
-                print(f"  Mood: {tile['mood']}")
-                print(f"  Style: {tile['style']}")
-                print(f"  Prompt: {tile['prompt'][:80]}...")
-                
-                saved_files.append(filepath)
-                
+                filepath, size = futures[i].result()
             except Exception as e:
-                print(f"\n✗ Failed to save tile {i}: {str(e)}")
-        else:
-            print(f"\n✗ Tile {i} has no image data")
+                log.append(f"\n✗ Failed to save tile {i}: {str(e)}")
+                continue
+            
+            log.append(f"\n✓ Saved: {os.path.basename(filepath)} ({size / 1024:.1f} KB)")
+            log.append(f"  Mood: {tile['mood']}")
+            log.append(f"  Style: {tile['style']}")
+            log.append(f"  Prompt: {tile['prompt'][:80]}...")
+            
+            saved_files.append(filepath)
+    
+    if log:
+        sys.stdout.write("\n".join(log) + "\n")
+        sys.stdout.flush()
     
     return saved_files
 
@@ -78,7 +115,9 @@ def test_visual_agent_with_strategy():
     try:
         # Initialize visual agent
         print("\n[1/4] Initializing Visual Agent...")
-        agent = VisualAgent()
+        # Deferred so the Gemini SDK and PIL load only when the test runs
+        from agents.visualAgent import get_visual_agent
+        agent = get_visual_agent()
         print("✓ Visual Agent initialized")
         
         # Generate mood board
@@ -89,7 +128,8 @@ def test_visual_agent_with_strategy():
         mood_board = agent.generate_mood_board(
             strategy=strategy,
             num_variations=4,
-            image_size="1024x1024"
+            image_size="1024x1024",
+            include_base64=True
         )
         
         # Display results
@@ -142,5 +182,4 @@ def test_visual_agent_with_strategy():
         return False
 
 if __name__ == "__main__":
-    import sys
     success = test_visual_agent_with_strategy()
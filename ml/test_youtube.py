@@ -1,13 +1,14 @@
 # YouTube Discovery Test
 
 from agents.youtube_discovery import discover_youtube_influencers
-import json
+from json_output import save_json
 
 print("\n" + "="*60)
 print("TESTING YOUTUBE DISCOVERY")
 print("="*60 + "\n")
 
-# Test discovery
+# Test discovery (repeat runs are served from the agent's ml/.cache/youtube disk cache;
+# run with YT_FORCE_REFRESH=1 to bypass it)
 influencers = discover_youtube_influencers(
     domain="fitness",
     audience="college students",
@@ -32,8 +33,9 @@ for i, inf in enumerate(influencers, 1):
     print(f"   Status: {inf['verification_status']}")
     print()
 
-# Save
-with open("test_youtube_output.json", "w", encoding="utf-8") as f:
-    json.dump(influencers, f, indent=2, ensure_ascii=False)
-
-print(f"✅ Saved {len(influencers)} influencers to test_youtube_output.json")
+# Save (skipped when the output is byte-identical to the previous run's)
+output_path = "test_youtube_output.json"
+if save_json(influencers, output_path, skip_unchanged=True):
+    print(f"✅ Saved {len(influencers)} influencers to {output_path}")
+else:
+    print(f"✅ {len(influencers)} influencers unchanged in {output_path}")